@@ -0,0 +1,80 @@
+import random
+from datetime import datetime, timedelta
+
+from src.core.payload_store import PayloadStore
+from src.services.news_api import NewsAPIWorker
+from src.services.rss_parser import RSSParser
+
+DEFAULT_ENTITIES = [
+    "Путин",
+    "Putin",
+    "Единая Россия",
+    "Трамп",
+    "Trump",
+]
+
+WORDS = {
+    "ru": (
+        "правительство заявил сегодня новости страна экономика выборы министр "
+        "регион депутат закон встреча президент партия совет решение рынок "
+        "бюджет область город проект неделя вопрос развитие данные рост"
+    ).split(),
+    "en": (
+        "government said today news country economy election minister region "
+        "senator law meeting president party council decision market budget "
+        "state city project week question growth data report"
+    ).split(),
+}
+
+NEWS_SOURCES = ["RIA Novosti", "TASS", "Interfax", "RBC", "Reuters", "BBC News"]
+RSS_SOURCES = ["https://lenta.ru/rss/news", "https://habr.com/ru/rss/all/all/"]
+
+
+def _sentence(rng: random.Random, language: str, entities: list[str], entity_density: float) -> str:
+    words = rng.choices(WORDS[language], k=rng.randint(8, 16))
+    if entities and rng.random() < entity_density:
+        words.insert(rng.randrange(len(words) + 1), rng.choice(entities))
+    return " ".join(words).capitalize() + "."
+
+
+def generate_corpus(
+    size: int,
+    entities: list[str] | None = None,
+    ru_share: float = 0.8,
+    entity_density: float = 0.2,
+    sentences: int = 12,
+    rss_share: float = 0.5,
+    seed: int = 42,
+) -> list[dict]:
+    rng = random.Random(seed)
+    entities = DEFAULT_ENTITIES if entities is None else entities
+    start = datetime(2025, 1, 1)
+
+    articles = []
+    for index in range(size):
+        language = "ru" if rng.random() < ru_share else "en"
+        is_rss = rng.random() < rss_share
+        title = _sentence(rng, language, entities, entity_density)
+        content = " ".join(
+            _sentence(rng, language, entities, entity_density) for _ in range(sentences)
+        )
+        articles.append(
+            {
+                "title": title,
+                "link": f"https://example.com/{language}/{index}",
+                "published_at": start + timedelta(minutes=index),
+                "source": rng.choice(RSS_SOURCES if is_rss else NEWS_SOURCES),
+                "content": content,
+            }
+        )
+    return articles
+
+
+def load_recorded_corpus(path: str) -> list[dict]:
+    articles: list[dict] = []
+    for record, payload in PayloadStore(path, mode="replay").iter_payloads():
+        if record.kind == "newsapi":
+            articles.extend(NewsAPIWorker.parse_payload(payload))
+        elif record.kind == "rss":
+            articles.extend(RSSParser.parse_payload(payload, record.key))
+    return articles
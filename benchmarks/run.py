@@ -0,0 +1,171 @@
+import argparse
+import asyncio
+import json
+import os
+import platform
+import resource
+import sys
+import tempfile
+import time
+from statistics import quantiles
+
+import pandas as pd
+
+from benchmarks.corpus import DEFAULT_ENTITIES, generate_corpus, load_recorded_corpus
+from src.analyzer.engine import MatchResult, MentionColumns, match_article
+from src.analyzer.matcher import EntityMatcher
+
+
+def _percentiles(samples: list[float]) -> dict[str, float]:
+    if len(samples) < 2:
+        value = samples[0] if samples else 0.0
+        return {"p50_ms": value * 1000, "p99_ms": value * 1000}
+    cuts = quantiles(samples, n=100, method="inclusive")
+    return {"p50_ms": cuts[49] * 1000, "p99_ms": cuts[98] * 1000}
+
+
+def _stage(samples: list[float], articles: int, mentions: int) -> dict:
+    total = sum(samples)
+    return {
+        "seconds": total,
+        "articles_per_sec": articles / total if total else None,
+        "mentions_per_sec": mentions / total if total else None,
+        **_percentiles(samples),
+    }
+
+
+def _peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def bench_match(articles: list[dict], entities: list[str]) -> tuple[dict, list[tuple[dict, MatchResult]]]:
+    matcher = EntityMatcher([e.strip().lower() for e in entities])
+    matched: list[tuple[dict, MatchResult]] = []
+    samples = []
+    for article in articles:
+        started = time.perf_counter()
+        result = match_article(matcher, article)
+        samples.append(time.perf_counter() - started)
+        if result is not None and result.entities:
+            matched.append((article, result))
+    mentions = sum(len(result.entities) for _, result in matched)
+    return _stage(samples, len(articles), mentions), matched
+
+
+def bench_frames(
+    matched: list[tuple[dict, MatchResult]], batch_size: int
+) -> tuple[dict, list[pd.DataFrame]]:
+    frames = []
+    samples = []
+    columns = MentionColumns()
+    started = time.perf_counter()
+    for article, result in matched:
+        columns.append(article, result)
+        if len(columns) >= batch_size:
+            frames.append(columns.to_frame())
+            samples.append(time.perf_counter() - started)
+            columns = MentionColumns()
+            started = time.perf_counter()
+    if len(columns):
+        frames.append(columns.to_frame())
+        samples.append(time.perf_counter() - started)
+    articles = sum(frame["content_hash"].nunique() for frame in frames)
+    return _stage(samples, articles, sum(len(frame) for frame in frames)), frames
+
+
+async def bench_save(frames: list[pd.DataFrame], db_uri: str, bulk: bool, chunk_size: int) -> dict:
+    from src.analyzer.repository import AnalyzerRepository
+    from src.core.models_base import Base
+    from src.core.postgres import Postgres
+
+    postgres = Postgres(uri=db_uri)
+    await postgres.connect()
+    try:
+        async with postgres.engine.begin() as connection:
+            await connection.run_sync(Base.metadata.create_all)
+
+        repository = AnalyzerRepository(postgres, bulk_save=bulk, chunk_size=chunk_size)
+        samples = []
+        for frame in frames:
+            started = time.perf_counter()
+            await repository.save_analysis_results(frame)
+            samples.append(time.perf_counter() - started)
+    finally:
+        await postgres.disconnect()
+
+    articles = sum(frame["content_hash"].nunique() for frame in frames)
+    return _stage(samples, articles, sum(len(frame) for frame in frames))
+
+
+async def run(args: argparse.Namespace) -> dict:
+    entities = args.entities or DEFAULT_ENTITIES
+    started = time.perf_counter()
+    if args.replay:
+        articles = load_recorded_corpus(args.replay)
+    else:
+        articles = generate_corpus(
+            size=args.articles,
+            entities=entities,
+            ru_share=args.ru_share,
+            entity_density=args.entity_density,
+            seed=args.seed,
+        )
+    corpus_seconds = time.perf_counter() - started
+
+    stages: dict[str, dict] = {}
+    stages["match"], matched = bench_match(articles, entities)
+    stages["frame"], frames = bench_frames(matched, args.batch_size)
+
+    if not args.skip_save:
+        db_uri = args.db
+        if db_uri is None:
+            db_path = os.path.join(tempfile.mkdtemp(prefix="analyzer-bench-"), "bench.db")
+            db_uri = f"sqlite+aiosqlite:///{db_path}"
+        stages["save"] = await bench_save(frames, db_uri, not args.per_row, args.batch_size)
+
+    return {
+        "params": {
+            "articles": len(articles),
+            "replay": args.replay,
+            "entities": len(entities),
+            "ru_share": args.ru_share,
+            "entity_density": args.entity_density,
+            "batch_size": args.batch_size,
+            "bulk_save": not args.per_row,
+            "seed": args.seed,
+        },
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+        },
+        "corpus_seconds": corpus_seconds,
+        "mentions": sum(len(frame) for frame in frames),
+        "stages": stages,
+        "peak_rss_mb": _peak_rss_mb(),
+    }
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Analyzer pipeline benchmarks")
+    parser.add_argument("--articles", type=int, default=5000)
+    parser.add_argument("--entities", nargs="*", default=None)
+    parser.add_argument("--ru-share", type=float, default=0.8)
+    parser.add_argument("--entity-density", type=float, default=0.2)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--replay", default=None, help="payload store recorded with PAYLOAD_STORE__MODE=record")
+    parser.add_argument("--db", default=None, help="SQLAlchemy async URI, defaults to a temporary SQLite file")
+    parser.add_argument("--per-row", action="store_true", help="benchmark the per-row save path")
+    parser.add_argument("--skip-save", action="store_true")
+    parser.add_argument("--output", default=None)
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    arguments = parse_args()
+    report = json.dumps(asyncio.run(run(arguments)), indent=2)
+    if arguments.output:
+        with open(arguments.output, "w") as f:
+            f.write(report)
+    print(report)
@@ -1,36 +1,84 @@
+import argparse
 import asyncio
 import os
 import logging
-
-from dependency_injector.wiring import Provide, inject
-
-from src.analyzer.polit_analyzator import MentionAnalyzer
-from src.app_container import ApplicationContainer
+import signal
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(message)s')
 logger = logging.getLogger(__name__)
 
 
-async def initialize_worker():
+# Heavy imports (pandas, SQLAlchemy, fastapi via dependency_injector wiring) stay
+# inside the functions: "spawn" workers re-import this module and only need the matcher.
+async def initialize_worker(daemon: bool = False, worker: bool = False):
+    from src.analyzer.polit_analyzator import MentionAnalyzer
+    from src.analyzer.scheduler import AnalyzerScheduler, JobWorker
+    from src.app_container import ApplicationContainer, init_resources, shutdown_resources
+
     logger.info("Начала работы analyzer")
 
     container = ApplicationContainer()
     os.environ["I_AM_WORKER"] = "true"
     os.environ["JOB_NAME"] = "analyzer"
 
-    await container.init_resources()
-    container.wire(modules=[__name__])
-    await analyzer_cron()
-    await container.shutdown_resources()
+    await init_resources(container)
+    try:
+        # The analyzer is an async resource, so everything built on it is resolved asynchronously.
+        if worker:
+            job_worker: JobWorker = await container.job_worker.async_()
+            await analyzer_daemon(job_worker)
+        elif daemon:
+            scheduler: AnalyzerScheduler = await container.scheduler.async_()
+            await analyzer_daemon(scheduler)
+        else:
+            analyzer: MentionAnalyzer = await container.analyzer.async_()
+            await analyzer_cron(analyzer)
+    finally:
+        if not (daemon or worker):
+            push_metrics()
+        await shutdown_resources(container)
+
+
+def push_metrics():
+    from src.core.metrics import export_metrics
+    from src.settings import settings
 
-@inject
-async def analyzer_cron(
-    controller: MentionAnalyzer = Provide[ApplicationContainer.analyzer],
-):
+    export_metrics(
+        job=os.environ["JOB_NAME"],
+        pushgateway_url=settings.metrics.pushgateway_url,
+        textfile_path=settings.metrics.textfile_path,
+    )
+
+
+async def analyzer_cron(controller):
     logger.info("Starting epic worker")
     await controller.analyze()
     logger.info("Starting epic done")
 
 
+async def analyzer_daemon(scheduler):
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, scheduler.stop)
+    try:
+        await scheduler.run(after_run=push_metrics)
+    finally:
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            loop.remove_signal_handler(sig)
+
+
 if __name__ == "__main__":
-    asyncio.run(initialize_worker())
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--daemon",
+        action="store_true",
+        help="keep pools and indexes warm and poll sources on SCHEDULER__INTERVALS",
+    )
+    parser.add_argument(
+        "--worker",
+        action="store_true",
+        help="like --daemon, but claim fetch units from the shared fetch_jobs table so that "
+        "any number of workers can split the sources",
+    )
+    args = parser.parse_args()
+    asyncio.run(initialize_worker(daemon=args.daemon, worker=args.worker))
@@ -0,0 +1,49 @@
+import argparse
+import asyncio
+import logging
+import os
+
+from dependency_injector.wiring import Provide, inject
+
+from src.analyzer.partitions import ArticlePartitionManager
+from src.app_container import ApplicationContainer, SharedResource, init_resources, shutdown_resources
+from src.settings import settings
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+
+async def initialize_worker(args: argparse.Namespace):
+    container = ApplicationContainer()
+    os.environ["JOB_NAME"] = "articles_partitions"
+
+    await init_resources(container, SharedResource)
+    container.wire(modules=[__name__])
+    await articles_partitions(args)
+    await shutdown_resources(container, SharedResource)
+
+
+@inject
+async def articles_partitions(
+    args: argparse.Namespace,
+    partitions: ArticlePartitionManager = Provide[ApplicationContainer.partitions],
+):
+    if args.command == "convert":
+        await partitions.convert(months_ahead=args.months_ahead)
+    elif args.command == "ensure":
+        await partitions.ensure_partitions(months_ahead=args.months_ahead)
+    elif args.command == "retention":
+        dropped = await partitions.drop_older_than(keep_months=args.keep_months)
+        logger.info(f"Dropped {len(dropped)} partitions")
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Monthly partitioning of the articles and mentions tables")
+    parser.add_argument("command", choices=["convert", "ensure", "retention"])
+    parser.add_argument("--months-ahead", type=int, default=3)
+    parser.add_argument("--keep-months", type=int, default=settings.postgres.articles_retention_months)
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    asyncio.run(initialize_worker(parse_args()))
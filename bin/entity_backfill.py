@@ -0,0 +1,48 @@
+import argparse
+import asyncio
+import logging
+import os
+
+from dependency_injector.wiring import Provide, inject
+
+from src.analyzer.backfill import EntityBackfill
+from src.app_container import ApplicationContainer, init_resources, shutdown_resources
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+
+async def initialize_worker(args: argparse.Namespace):
+    container = ApplicationContainer()
+    os.environ["JOB_NAME"] = "entity_backfill"
+
+    await init_resources(container)
+    container.wire(modules=[__name__])
+    try:
+        await entity_backfill(args)
+    finally:
+        await shutdown_resources(container)
+
+
+@inject
+async def entity_backfill(
+    args: argparse.Namespace,
+    backfill: EntityBackfill = Provide[ApplicationContainer.backfill],
+):
+    saved = await backfill.run(entities=args.entity, days=args.days)
+    logger.info(f"Backfilled {saved} mentions")
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Backfill mentions of new entities from stored articles")
+    parser.add_argument(
+        "--entity",
+        action="append",
+        help="entity to backfill, may be repeated; defaults to dictionary entities without any mentions",
+    )
+    parser.add_argument("--days", type=int, default=365)
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    asyncio.run(initialize_worker(parse_args()))
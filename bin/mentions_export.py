@@ -0,0 +1,51 @@
+import argparse
+import asyncio
+import logging
+import os
+
+from dependency_injector.wiring import Provide, inject
+
+from src.analyzer.export import MentionExporter
+from src.app_container import ApplicationContainer, SharedResource, init_resources, shutdown_resources
+from src.settings import settings
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+
+async def initialize_worker(args: argparse.Namespace):
+    container = ApplicationContainer()
+    os.environ["JOB_NAME"] = "mentions_export"
+
+    await init_resources(container, SharedResource)
+    container.wire(modules=[__name__])
+    try:
+        await mentions_export(args)
+    finally:
+        await shutdown_resources(container, SharedResource)
+
+
+@inject
+async def mentions_export(
+    args: argparse.Namespace,
+    exporter: MentionExporter = Provide[ApplicationContainer.exporter],
+):
+    exported = await exporter.export_dataset(
+        args.output, days=args.days, entity=args.entity, source=args.source
+    )
+    logger.info(f"Exported {exported} mentions to {args.output}")
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Export mentions to Parquet files partitioned by date and entity"
+    )
+    parser.add_argument("--output", default=settings.export.path)
+    parser.add_argument("--days", type=int, default=30)
+    parser.add_argument("--entity")
+    parser.add_argument("--source")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    asyncio.run(initialize_worker(parse_args()))
@@ -6,7 +6,7 @@ from fastapi import FastAPI
 from prometheus_fastapi_instrumentator import Instrumentator
 from starlette.middleware.cors import CORSMiddleware
 
-from src.app_container import ApplicationContainer
+from src.app_container import ApplicationContainer, SharedResource, init_resources, shutdown_resources
 from src.router import api_router
 from src.settings import settings
 
@@ -17,11 +17,11 @@ async def lifespan(_app: FastAPI):
     container = ApplicationContainer()
     os.environ["JOB_NAME"] = "app_server"
     print("[LIFESPAN] Before init_resources")
-    await container.init_resources()
+    await init_resources(container, SharedResource)
     print("[LIFESPAN] After init_resources")
     yield
     print("[LIFESPAN] Shutting down resources...")
-    await container.shutdown_resources()
+    await shutdown_resources(container, SharedResource)
 
 
 app = FastAPI(
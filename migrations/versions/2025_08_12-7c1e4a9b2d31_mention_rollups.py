@@ -0,0 +1,49 @@
+"""mention rollups
+
+Revision ID: 7c1e4a9b2d31
+Revises: 50df987ece50
+Create Date: 2025-08-12 11:24:37.512904
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = '7c1e4a9b2d31'
+down_revision: Union[str, None] = '50df987ece50'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('mention_rollups',
+    sa.Column('entity_id', sa.Integer(), nullable=False),
+    sa.Column('source', sa.String(length=100), nullable=False),
+    sa.Column('granularity', sa.String(length=8), nullable=False),
+    sa.Column('bucket', postgresql.TIMESTAMP(timezone=True), nullable=False),
+    sa.Column('mentions', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['entity_id'], ['political_entities.id'], ),
+    sa.PrimaryKeyConstraint('entity_id', 'source', 'granularity', 'bucket')
+    )
+    op.create_index('ix_mention_rollups_granularity_bucket', 'mention_rollups', ['granularity', 'bucket'], unique=False)
+
+    for granularity in ('hour', 'day'):
+        op.execute(
+            f"""
+            INSERT INTO mention_rollups (entity_id, source, granularity, bucket, mentions)
+            SELECT m.entity_id, a.source, '{granularity}',
+                   date_trunc('{granularity}', a.published_at AT TIME ZONE 'UTC') AT TIME ZONE 'UTC',
+                   sum(m.count)
+            FROM mentions m
+            JOIN articles a ON a.id = m.article_id
+            GROUP BY 1, 2, 3, 4
+            """
+        )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_mention_rollups_granularity_bucket', table_name='mention_rollups')
+    op.drop_table('mention_rollups')
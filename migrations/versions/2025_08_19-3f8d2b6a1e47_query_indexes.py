@@ -0,0 +1,29 @@
+"""query indexes
+
+Revision ID: 3f8d2b6a1e47
+Revises: 7c1e4a9b2d31
+Create Date: 2025-08-19 16:02:11.348120
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f8d2b6a1e47'
+down_revision: Union[str, None] = '7c1e4a9b2d31'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_articles_published_at', 'articles', ['published_at'], unique=False)
+    op.create_index('ix_articles_source_published_at', 'articles', ['source', 'published_at'], unique=False)
+    op.create_index('ix_mentions_entity_id', 'mentions', ['entity_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_mentions_entity_id', table_name='mentions')
+    op.drop_index('ix_articles_source_published_at', table_name='articles')
+    op.drop_index('ix_articles_published_at', table_name='articles')
@@ -0,0 +1,28 @@
+"""article near duplicates
+
+Revision ID: b94e07c3d5a2
+Revises: 3f8d2b6a1e47
+Create Date: 2025-08-26 10:47:53.901266
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b94e07c3d5a2'
+down_revision: Union[str, None] = '3f8d2b6a1e47'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('articles', sa.Column('simhash', sa.BigInteger(), nullable=True))
+    op.add_column('articles', sa.Column('cluster_id', sa.String(length=64), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('articles', 'cluster_id')
+    op.drop_column('articles', 'simhash')
@@ -0,0 +1,36 @@
+"""entity aliases
+
+Revision ID: e2a5c8f41b6d
+Revises: b94e07c3d5a2
+Create Date: 2025-09-03 13:18:42.076514
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e2a5c8f41b6d'
+down_revision: Union[str, None] = 'b94e07c3d5a2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('entity_aliases',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('entity_id', sa.Integer(), nullable=False),
+    sa.Column('alias', sa.String(length=200), nullable=False),
+    sa.Column('kind', sa.String(length=20), nullable=False),
+    sa.ForeignKeyConstraint(['entity_id'], ['political_entities.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('alias')
+    )
+    op.create_index('ix_entity_aliases_entity_id', 'entity_aliases', ['entity_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_entity_aliases_entity_id', table_name='entity_aliases')
+    op.drop_table('entity_aliases')
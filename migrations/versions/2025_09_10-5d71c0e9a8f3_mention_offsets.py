@@ -0,0 +1,26 @@
+"""mention offsets
+
+Revision ID: 5d71c0e9a8f3
+Revises: e2a5c8f41b6d
+Create Date: 2025-09-10 11:02:37.514208
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5d71c0e9a8f3'
+down_revision: Union[str, None] = 'e2a5c8f41b6d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('mentions', sa.Column('offsets', sa.LargeBinary(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('mentions', 'offsets')
@@ -0,0 +1,33 @@
+"""articles text trigram index
+
+Revision ID: 8a3f6c2d9e10
+Revises: 5d71c0e9a8f3
+Create Date: 2025-09-17 10:41:09.836152
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8a3f6c2d9e10'
+down_revision: Union[str, None] = '5d71c0e9a8f3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    op.create_index(
+        'ix_articles_text_trgm',
+        'articles',
+        [sa.text("lower(title || ' ' || coalesce(content, '')) gin_trgm_ops")],
+        unique=False,
+        postgresql_using='gin',
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_articles_text_trgm', table_name='articles')
@@ -0,0 +1,43 @@
+"""fetch jobs
+
+Revision ID: c6e19f4a7b03
+Revises: 8a3f6c2d9e10
+Create Date: 2025-09-24 11:07:53.418290
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c6e19f4a7b03'
+down_revision: Union[str, None] = '8a3f6c2d9e10'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('fetch_jobs',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('kind', sa.String(length=20), nullable=False),
+    sa.Column('key', sa.String(length=1000), nullable=False),
+    sa.Column('interval', sa.Float(), nullable=False),
+    sa.Column('next_run_at', postgresql.TIMESTAMP(timezone=True), nullable=False),
+    sa.Column('locked_by', sa.String(length=200), nullable=True),
+    sa.Column('locked_until', postgresql.TIMESTAMP(timezone=True), nullable=True),
+    sa.Column('attempts', sa.Integer(), nullable=False),
+    sa.Column('last_error', sa.Text(), nullable=True),
+    sa.Column('finished_at', postgresql.TIMESTAMP(timezone=True), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_fetch_jobs_kind_key', 'fetch_jobs', ['kind', 'key'], unique=True)
+    op.create_index('ix_fetch_jobs_next_run_at', 'fetch_jobs', ['next_run_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_fetch_jobs_next_run_at', table_name='fetch_jobs')
+    op.drop_index('ix_fetch_jobs_kind_key', table_name='fetch_jobs')
+    op.drop_table('fetch_jobs')
@@ -0,0 +1,79 @@
+"""fold latin entities
+
+Revision ID: 3b8d51e07c42
+Revises: c6e19f4a7b03
+Create Date: 2025-10-01 10:14:26.503117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3b8d51e07c42'
+down_revision: Union[str, None] = 'c6e19f4a7b03'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Bare Latin names from the old flat entity list, now aliases of the configured entities.
+LEGACY_ENTITIES = {
+    'putin': 'путин',
+    'trump': 'трамп',
+}
+
+
+def upgrade() -> None:
+    for legacy, canonical in LEGACY_ENTITIES.items():
+        op.execute(
+            f"""
+            INSERT INTO political_entities (name, type)
+            SELECT '{canonical}', type FROM political_entities WHERE name = '{legacy}'
+            ON CONFLICT (name) DO NOTHING
+            """
+        )
+        ids = f"""
+            (SELECT id FROM political_entities WHERE name = '{legacy}') AS old,
+            (SELECT id FROM political_entities WHERE name = '{canonical}') AS new
+        """
+        # Articles that matched both spellings keep a single mention with the counts and spans combined.
+        op.execute(
+            f"""
+            UPDATE mentions m
+            SET count = m.count + o.count, offsets = coalesce(m.offsets, ''::bytea) || coalesce(o.offsets, ''::bytea)
+            FROM mentions o, {ids}
+            WHERE o.entity_id = old.id AND m.entity_id = new.id AND m.article_id = o.article_id
+            """
+        )
+        op.execute(
+            f"""
+            DELETE FROM mentions o
+            USING mentions m, {ids}
+            WHERE o.entity_id = old.id AND m.entity_id = new.id AND m.article_id = o.article_id
+            """
+        )
+        op.execute(f"UPDATE mentions SET entity_id = new.id FROM {ids} WHERE entity_id = old.id")
+        op.execute(
+            f"""
+            INSERT INTO mention_rollups (entity_id, source, granularity, bucket, mentions)
+            SELECT new.id, r.source, r.granularity, r.bucket, r.mentions
+            FROM mention_rollups r, {ids}
+            WHERE r.entity_id = old.id
+            ON CONFLICT (entity_id, source, granularity, bucket)
+            DO UPDATE SET mentions = mention_rollups.mentions + excluded.mentions
+            """
+        )
+        op.execute(f"DELETE FROM mention_rollups USING {ids} WHERE entity_id = old.id")
+        op.execute(
+            f"""
+            UPDATE entity_aliases SET entity_id = new.id, kind = 'alias'
+            FROM {ids}
+            WHERE entity_id = old.id
+            """
+        )
+        op.execute(f"DELETE FROM political_entities WHERE name = '{legacy}'")
+
+
+def downgrade() -> None:
+    # The folded mentions cannot be told apart again; the next dictionary sync keeps the aliases consistent.
+    pass
@@ -0,0 +1,31 @@
+"""api quota usage
+
+Revision ID: 9e4a27c15d68
+Revises: 3b8d51e07c42
+Create Date: 2025-10-02 09:41:12.118734
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9e4a27c15d68'
+down_revision: Union[str, None] = '3b8d51e07c42'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('api_quota_usage',
+    sa.Column('provider', sa.String(length=50), nullable=False),
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('requests', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('provider', 'day')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('api_quota_usage')
@@ -0,0 +1,43 @@
+"""mention published at
+
+Revision ID: 4a6c2e81f5b9
+Revises: 9e4a27c15d68
+Create Date: 2025-10-20 11:27:45.602391
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4a6c2e81f5b9'
+down_revision: Union[str, None] = '9e4a27c15d68'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('mentions', sa.Column('published_at', postgresql.TIMESTAMP(timezone=True), nullable=True))
+    op.execute(
+        """
+        UPDATE mentions m
+        SET published_at = a.published_at
+        FROM articles a
+        WHERE a.id = m.article_id
+        """
+    )
+    op.alter_column('mentions', 'published_at', nullable=False)
+    # A unique key on a partitioned table has to include the partition key.
+    op.drop_index('ix_mentions_article_entity', table_name='mentions')
+    op.create_index(
+        'ix_mentions_article_entity', 'mentions', ['article_id', 'entity_id', 'published_at'], unique=True
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_mentions_article_entity', table_name='mentions')
+    op.create_index('ix_mentions_article_entity', 'mentions', ['article_id', 'entity_id'], unique=True)
+    op.drop_column('mentions', 'published_at')
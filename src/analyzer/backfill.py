@@ -0,0 +1,79 @@
+import logging
+import time
+from datetime import datetime, timedelta, timezone
+
+from src.analyzer.dictionary import _normalize
+from src.analyzer.matcher import EntityMatcher
+from src.analyzer.polit_analyzator import MentionAnalyzer
+from src.analyzer.repository import AnalyzerRepository
+from src.analyzer.snippets import article_text, pack_spans
+
+logger = logging.getLogger(__name__)
+
+
+def like_patterns(forms: list[str]) -> list[str]:
+    # A form that contains a shorter form is already covered by that form's LIKE pattern.
+    minimal: list[str] = []
+    for form in sorted(set(forms), key=len):
+        if not any(shorter in form for shorter in minimal):
+            minimal.append(form)
+    return [
+        "%" + form.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+        for form in minimal
+    ]
+
+
+class EntityBackfill:
+    def __init__(self, analyzer: MentionAnalyzer, repository: AnalyzerRepository, batch_size: int = 1000):
+        self.analyzer = analyzer
+        self.repository = repository
+        self.batch_size = batch_size
+
+    async def run(self, entities: list[str] | None = None, days: int = 365) -> int:
+        await self.analyzer.load_dictionary()
+        dictionary = self.analyzer.dictionary
+
+        if entities:
+            names = [_normalize(entity) for entity in entities]
+            unknown = [name for name in names if name not in self.analyzer.entities]
+            if unknown:
+                raise ValueError(f"Entities are not in the dictionary: {', '.join(unknown)}")
+        else:
+            names = await self.repository.get_entities_without_mentions(self.analyzer.entities)
+        if not names:
+            logger.info("No entities to backfill")
+            return 0
+
+        forms = {form: name for form, name in dictionary.forms.items() if name in names}
+        matcher = EntityMatcher(forms)
+        entity_ids = await self.repository.get_entity_ids(names)
+        patterns = like_patterns(list(forms))
+        since = datetime.now(timezone.utc) - timedelta(days=days)
+        logger.info(f"Backfilling {', '.join(names)} since {since:%Y-%m-%d} with {len(patterns)} patterns")
+
+        started = time.monotonic()
+        candidates = 0
+        saved = 0
+        async for batch in self.repository.iter_backfill_candidates(patterns, since, self.batch_size):
+            candidates += len(batch)
+            rows = []
+            for article in batch:
+                text = article_text(article.title, article.content or "").lower()
+                for name, spans in matcher.find_spans(text).items():
+                    rows.append(
+                        {
+                            "article_id": article.id,
+                            "entity_id": entity_ids[name],
+                            "count": len(spans),
+                            "offsets": pack_spans(spans),
+                            "source": article.source,
+                            "published_at": article.published_at,
+                        }
+                    )
+            saved += await self.repository.save_backfill_mentions(rows)
+
+        logger.info(
+            f"Backfill scanned {candidates} candidate articles and saved {saved} mentions "
+            f"in {time.monotonic() - started:.1f}s"
+        )
+        return saved
@@ -0,0 +1,137 @@
+import json
+import logging
+import os
+import pickle
+from dataclasses import dataclass
+from hashlib import sha256
+from typing import Iterable
+
+from src.analyzer.inflection import inflect, inflector_name
+from src.analyzer.matcher import EntityMatcher
+
+logger = logging.getLogger(__name__)
+
+# Bumped whenever the pickled layout or the way forms are assigned changes.
+DICTIONARY_FORMAT = 2
+
+
+@dataclass(frozen=True)
+class EntityEntry:
+    name: str
+    type: str | None = None
+    aliases: tuple[str, ...] = ()
+    abbreviations: tuple[str, ...] = ()
+
+
+@dataclass
+class CompiledDictionary:
+    entries: list[EntityEntry]
+    forms: dict[str, str]
+    kinds: dict[str, str]
+    matcher: EntityMatcher
+
+
+def _normalize(value: str) -> str:
+    return " ".join(value.strip().lower().split())
+
+
+def _abbreviations(values: Iterable[str]) -> tuple[str, ...]:
+    # Case is lost after normalization, so all-caps words are remembered to keep them uninflected.
+    words = (word for value in values for word in value.split() if word.isupper() and len(word) > 1)
+    return tuple(dict.fromkeys(word.lower() for word in words))
+
+
+def build_entries(entities: Iterable[str], definitions: Iterable) -> list[EntityEntry]:
+    entries: dict[str, EntityEntry] = {}
+    for definition in definitions:
+        name = _normalize(definition.name)
+        aliases = tuple(dict.fromkeys(_normalize(alias) for alias in definition.aliases if alias.strip()))
+        abbreviations = _abbreviations([definition.name, *definition.aliases])
+        entries[name] = EntityEntry(name, definition.type, aliases, abbreviations)
+
+    known = set(entries) | {alias for entry in entries.values() for alias in entry.aliases}
+    for entity in entities:
+        name = _normalize(entity)
+        if name and name not in known:
+            entries[name] = EntityEntry(name, abbreviations=_abbreviations([entity]))
+            known.add(name)
+    return list(entries.values())
+
+
+def merge_entries(base: list[EntityEntry], extra: list[EntityEntry]) -> list[EntityEntry]:
+    merged = {entry.name: entry for entry in base}
+    # Configured aliases win over stored names: a row stored under an alias, e.g. a bare "putin"
+    # left over from the flat entity list, folds into the entity that alias belongs to.
+    owners = {alias: entry.name for entry in base for alias in entry.aliases}
+    for entry in extra:
+        name = owners.get(entry.name, entry.name)
+        current = merged.get(name)
+        if current is None:
+            merged[name] = entry
+            continue
+        aliases = tuple(alias for alias in dict.fromkeys(current.aliases + entry.aliases) if alias != name)
+        merged[name] = EntityEntry(name, current.type or entry.type, aliases, current.abbreviations)
+    return list(merged.values())
+
+
+def _build(entries: list[EntityEntry], with_inflections: bool) -> CompiledDictionary:
+    forms: dict[str, str] = {}
+    kinds: dict[str, str] = {}
+
+    def add(form: str, name: str, kind: str) -> None:
+        if form and form not in forms:
+            forms[form] = name
+            kinds[form] = kind
+
+    for entry in entries:
+        add(entry.name, entry.name, "canonical")
+    for entry in entries:
+        for alias in entry.aliases:
+            add(alias, entry.name, "alias")
+    if with_inflections:
+        for entry in entries:
+            for phrase in (entry.name, *entry.aliases):
+                for form in inflect(phrase, entry.abbreviations):
+                    add(form, entry.name, "inflection")
+
+    return CompiledDictionary(entries, forms, kinds, EntityMatcher(forms))
+
+
+def compile_dictionary(
+    entries: list[EntityEntry],
+    with_inflections: bool = True,
+    cache_dir: str | None = None,
+) -> CompiledDictionary:
+    if not cache_dir:
+        return _build(entries, with_inflections)
+
+    key = sha256(
+        json.dumps(
+            [
+                DICTIONARY_FORMAT,
+                [[entry.name, entry.type, list(entry.aliases), list(entry.abbreviations)] for entry in entries],
+                with_inflections and inflector_name(),
+            ],
+            ensure_ascii=False,
+        ).encode("utf-8")
+    ).hexdigest()
+    cache_path = os.path.join(cache_dir, f"entities-{key[:16]}.pickle")
+
+    try:
+        with open(cache_path, "rb") as f:
+            return pickle.load(f)
+    except FileNotFoundError:
+        pass
+    except Exception as e:
+        logger.warning(f"Failed to load compiled entity dictionary: {str(e)}")
+
+    compiled = _build(entries, with_inflections)
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        tmp_path = f"{cache_path}.tmp"
+        with open(tmp_path, "wb") as f:
+            pickle.dump(compiled, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, cache_path)
+    except OSError as e:
+        logger.warning(f"Failed to cache compiled entity dictionary: {str(e)}")
+    return compiled
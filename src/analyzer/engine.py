@@ -0,0 +1,148 @@
+import logging
+from hashlib import md5
+from typing import NamedTuple
+
+from src.analyzer.matcher import EntityMatcher
+from src.analyzer.near_dup import simhash
+from src.analyzer.snippets import article_text, pack_spans
+
+FRAME_COLUMNS = (
+    "date",
+    "entity",
+    "count",
+    "offsets",
+    "source",
+    "article_url",
+    "title",
+    "content",
+    "content_hash",
+)
+FINGERPRINT_COLUMNS = ("simhash", "cluster_id")
+
+logger = logging.getLogger(__name__)
+
+_matcher: EntityMatcher | None = None
+_fingerprints = False
+
+
+class MatchResult(NamedTuple):
+    content_hash: str
+    fingerprint: int | None
+    entities: list[str]
+    counts: list[int]
+    offsets: list[bytes]
+
+
+def init_worker(forms: dict[str, str], fingerprints: bool = False) -> None:
+    global _matcher, _fingerprints
+    _matcher = EntityMatcher(forms)
+    _fingerprints = fingerprints
+
+
+def match_batch(articles: list[dict]) -> list[MatchResult | None]:
+    assert _matcher is not None, "worker is not initialized"
+    return match_many(_matcher, articles, _fingerprints)
+
+
+def match_many(
+    matcher: EntityMatcher, articles: list[dict], fingerprint: bool = False
+) -> list[MatchResult | None]:
+    # A malformed article is skipped on its own instead of failing the rest of its batch.
+    results: list[MatchResult | None] = []
+    for article in articles:
+        try:
+            results.append(match_article(matcher, article, fingerprint))
+        except Exception as e:
+            logger.warning(f"Failed to process article: {str(e)}")
+            results.append(None)
+    return results
+
+
+def match_article(
+    matcher: EntityMatcher, article: dict, fingerprint: bool = False
+) -> MatchResult | None:
+    if not article.get("title") or not article.get("content"):
+        return None
+
+    full_text = article_text(article["title"], article["content"]).lower()
+    spans = matcher.find_spans(full_text)
+    return MatchResult(
+        generate_content_hash(full_text),
+        simhash(full_text) if fingerprint else None,
+        list(spans),
+        [len(entity_spans) for entity_spans in spans.values()],
+        [pack_spans(entity_spans) for entity_spans in spans.values()],
+    )
+
+
+class MentionColumns:
+    # Mention rows are collected column by column: article-level values are repeated once per
+    # matched entity instead of building a dict per mention and transposing it in pandas.
+    def __init__(self, fingerprints: bool = False):
+        names = FRAME_COLUMNS + (FINGERPRINT_COLUMNS if fingerprints else ())
+        self.columns: dict[str, list] = {name: [] for name in names}
+        self.fingerprints = fingerprints
+
+    def __len__(self) -> int:
+        return len(self.columns["entity"])
+
+    def append(
+        self,
+        article: dict,
+        result: MatchResult,
+        fingerprint: int | None = None,
+        cluster_id: str | None = None,
+    ) -> int:
+        size = len(result.entities)
+        if not size:
+            return 0
+        columns = self.columns
+        columns["date"].extend([article.get("published_at")] * size)
+        columns["entity"].extend(result.entities)
+        columns["count"].extend(result.counts)
+        columns["offsets"].extend(result.offsets)
+        columns["source"].extend([article.get("source", "unknown")] * size)
+        columns["article_url"].extend([article.get("link") or article.get("url", "")] * size)
+        columns["title"].extend([article["title"]] * size)
+        columns["content"].extend([article["content"]] * size)
+        columns["content_hash"].extend([result.content_hash] * size)
+        if self.fingerprints:
+            columns["simhash"].extend([fingerprint] * size)
+            columns["cluster_id"].extend([cluster_id] * size)
+        return size
+
+    def to_frame(self):
+        import pandas as pd
+
+        columns = self.columns
+        frame = pd.DataFrame(
+            {
+                "date": parse_dates(columns["date"]),
+                "entity": pd.Categorical(columns["entity"]),
+                "count": pd.Series(columns["count"], dtype="int32"),
+                "offsets": pd.Series(columns["offsets"], dtype=object),
+                "source": pd.Categorical(columns["source"]),
+                "article_url": pd.Series(columns["article_url"], dtype=object),
+                "title": pd.Series(columns["title"], dtype=object),
+                "content": pd.Series(columns["content"], dtype=object),
+                "content_hash": pd.Series(columns["content_hash"], dtype=object),
+            }
+        )
+        if self.fingerprints:
+            frame["simhash"] = pd.Series(columns["simhash"], dtype="int64")
+            frame["cluster_id"] = pd.Series(columns["cluster_id"], dtype=object)
+        return frame
+
+
+def parse_dates(values: list):
+    import pandas as pd
+
+    # Timezone policy: naive values (RSS struct_time, NewsAPI "...Z" strings) are UTC, aware
+    # values are converted to UTC and anything unparseable is stamped with the current time.
+    parsed = pd.to_datetime(pd.Series(values, dtype=object), utc=True, errors="coerce", format="mixed")
+    return parsed.fillna(pd.Timestamp.now(tz="UTC"))
+
+
+def generate_content_hash(text: str) -> str:
+    return md5(text.strip().encode("utf-8")).hexdigest()
+
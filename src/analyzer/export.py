@@ -0,0 +1,201 @@
+import logging
+import os
+import time
+from datetime import date, datetime, timedelta, timezone
+from typing import AsyncIterator, Sequence
+from urllib.parse import quote
+
+from src.analyzer.repository import AnalyzerRepository
+
+logger = logging.getLogger(__name__)
+
+EXPORT_FORMATS = ("parquet", "arrow")
+PARTITION_COLUMNS = ("date", "entity")
+PART_FILE = "part-0.parquet"
+
+
+def _pyarrow():
+    try:
+        import pyarrow as pa  # type: ignore
+        import pyarrow.parquet as pq  # type: ignore
+    except ImportError as e:
+        raise RuntimeError("Mention export requires pyarrow to be installed") from e
+    return pa, pq
+
+
+def export_schema(pa):
+    return pa.schema(
+        [
+            ("mention_id", pa.int64()),
+            ("date", pa.date32()),
+            ("entity", pa.string()),
+            ("source", pa.string()),
+            ("published_at", pa.timestamp("us", tz="UTC")),
+            ("article_url", pa.string()),
+            ("title", pa.string()),
+            ("count", pa.int32()),
+            ("offsets", pa.binary()),
+        ]
+    )
+
+
+def _utc(value: datetime | str) -> datetime:
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def to_record_batch(pa, schema, rows: Sequence):
+    published_at = [_utc(row.published_at) for row in rows]
+    return pa.RecordBatch.from_pydict(
+        {
+            "mention_id": [row.mention_id for row in rows],
+            "date": [value.date() for value in published_at],
+            "entity": [row.entity for row in rows],
+            "source": [row.source for row in rows],
+            "published_at": published_at,
+            "article_url": [row.article_url for row in rows],
+            "title": [row.title for row in rows],
+            "count": [row.count for row in rows],
+            "offsets": [row.offsets for row in rows],
+        },
+        schema=schema,
+    )
+
+
+def partition_path(root: str, day: date, entity: str) -> str:
+    return os.path.join(root, f"date={day.isoformat()}", f"entity={quote(entity, safe='')}")
+
+
+def _runs(keys: list[tuple]) -> list[tuple[int, int]]:
+    runs = []
+    start = 0
+    for end in range(1, len(keys) + 1):
+        if end == len(keys) or keys[end] != keys[start]:
+            runs.append((start, end))
+            start = end
+    return runs
+
+
+class _ChunkSink:
+    # Write-only file object that lets the writers' output be drained between batches.
+    def __init__(self):
+        self.buffer = bytearray()
+        self.position = 0
+        self.closed = False
+
+    def write(self, data) -> int:
+        self.buffer += data
+        self.position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self.position
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        self.closed = True
+
+    def drain(self) -> bytes:
+        data = bytes(self.buffer)
+        self.buffer.clear()
+        return data
+
+
+class MentionExporter:
+    def __init__(
+        self,
+        repository: AnalyzerRepository,
+        batch_size: int = 10_000,
+        compression: str = "zstd",
+    ):
+        self.repository = repository
+        self.batch_size = batch_size
+        self.compression = compression
+
+    async def export_dataset(
+        self,
+        path: str,
+        days: int = 30,
+        entity: str | None = None,
+        source: str | None = None,
+    ) -> int:
+        pa, pq = _pyarrow()
+        schema = export_schema(pa)
+        # Partition values live in the directory names, as in any Hive-style dataset.
+        columns = [name for name in schema.names if name not in PARTITION_COLUMNS]
+        file_schema = pa.schema([schema.field(name) for name in columns])
+        # Starts at midnight so that every partition written holds the whole day and a re-export
+        # with a different window never replaces a day with part of it.
+        since = datetime.now(timezone.utc) - timedelta(days=days)
+        since = since.replace(hour=0, minute=0, second=0, microsecond=0)
+        logger.info(f"Exporting mentions since {since:%Y-%m-%d} to {path}")
+
+        started = time.monotonic()
+        exported = 0
+        partitions = 0
+        key, writer = None, None
+        try:
+            async for rows in self.repository.iter_mention_export(
+                since, entity=entity, source=source, batch_size=self.batch_size
+            ):
+                batch = to_record_batch(pa, schema, rows)
+                keys = list(zip(batch.column("date").to_pylist(), batch.column("entity").to_pylist()))
+                for start, end in _runs(keys):
+                    if writer is None or keys[start] != key:
+                        if writer is not None:
+                            writer.close()
+                        key = keys[start]
+                        directory = partition_path(path, *key)
+                        os.makedirs(directory, exist_ok=True)
+                        writer = pq.ParquetWriter(
+                            os.path.join(directory, PART_FILE), file_schema, compression=self.compression
+                        )
+                        partitions += 1
+                    writer.write_batch(batch.slice(start, end - start).select(columns))
+                exported += len(rows)
+        finally:
+            if writer is not None:
+                writer.close()
+
+        logger.info(
+            f"Exported {exported} mentions into {partitions} partitions in {time.monotonic() - started:.1f}s"
+        )
+        return exported
+
+    def iter_file(
+        self,
+        format: str = "parquet",
+        days: int = 30,
+        entity: str | None = None,
+        source: str | None = None,
+    ) -> AsyncIterator[bytes]:
+        # Validated eagerly so that callers can report errors before streaming starts.
+        if format not in EXPORT_FORMATS:
+            raise ValueError(f"Unsupported export format: {format}")
+        pa, pq = _pyarrow()
+        since = datetime.now(timezone.utc) - timedelta(days=days)
+        return self._iter_file(pa, pq, format, since, entity, source)
+
+    async def _iter_file(
+        self, pa, pq, format: str, since: datetime, entity: str | None, source: str | None
+    ) -> AsyncIterator[bytes]:
+        schema = export_schema(pa)
+        sink = _ChunkSink()
+        if format == "parquet":
+            writer = pq.ParquetWriter(sink, schema, compression=self.compression)
+        else:
+            writer = pa.ipc.new_stream(sink, schema)
+        try:
+            async for rows in self.repository.iter_mention_export(
+                since, entity=entity, source=source, batch_size=self.batch_size
+            ):
+                writer.write_batch(to_record_batch(pa, schema, rows))
+                yield sink.drain()
+        finally:
+            writer.close()
+        yield sink.drain()
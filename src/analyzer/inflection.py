@@ -0,0 +1,94 @@
+import logging
+import re
+from functools import lru_cache
+from typing import Iterable
+
+logger = logging.getLogger(__name__)
+
+CASES = ("nomn", "gent", "datv", "accs", "ablt", "loct")
+_CYRILLIC = re.compile(r"^[а-яё-]+$")
+_HUSHING = set("гкхжшщч")
+
+_ADJECTIVE_ENDINGS = {
+    "ая": ("ая", "ой", "ой", "ую", "ой", "ой"),
+    "яя": ("яя", "ей", "ей", "юю", "ей", "ей"),
+    "ый": ("ый", "ого", "ому", "ый", "ым", "ом"),
+    "ой": ("ой", "ого", "ому", "ой", "ым", "ом"),
+    "ий": ("ий", "ого", "ому", "ий", "им", "ом"),
+    "ое": ("ое", "ого", "ому", "ое", "ым", "ом"),
+}
+
+
+def _rule_forms(word: str) -> tuple[str, ...]:
+    if not _CYRILLIC.match(word) or len(word) < 3:
+        return (word,) * len(CASES)
+
+    for ending, endings in _ADJECTIVE_ENDINGS.items():
+        if word.endswith(ending) and len(word) > 4:
+            stem = word[: -len(ending)]
+            return tuple(stem + suffix for suffix in endings)
+
+    if word.endswith("ия"):
+        stem = word[:-2]
+        return tuple(stem + suffix for suffix in ("ия", "ии", "ии", "ию", "ией", "ии"))
+    if word.endswith("я"):
+        stem = word[:-1]
+        return tuple(stem + suffix for suffix in ("я", "и", "е", "ю", "ей", "е"))
+    if word.endswith("а"):
+        stem = word[:-1]
+        genitive = "и" if stem[-1] in _HUSHING else "ы"
+        return tuple(stem + suffix for suffix in ("а", genitive, "е", "у", "ой", "е"))
+    if word.endswith("ь"):
+        stem = word[:-1]
+        return tuple(stem + suffix for suffix in ("ь", "я", "ю", "я", "ем", "е"))
+    if word.endswith(("о", "е")):
+        stem = word[:-1]
+        return tuple(stem + suffix for suffix in (word[-1], "а", "у", word[-1], "ом", "е"))
+    if word[-1] in "аеёиоуыэюяй":
+        return (word,) * len(CASES)
+
+    instrumental = "ым" if word.endswith(("ин", "ын", "ов", "ев", "ёв")) else "ом"
+    return tuple(word + suffix for suffix in ("", "а", "у", "а", instrumental, "е"))
+
+
+@lru_cache(maxsize=1)
+def _morph_analyzer():
+    try:
+        import pymorphy3  # type: ignore
+    except ImportError:
+        return None
+    return pymorphy3.MorphAnalyzer()
+
+
+def _morph_forms(word: str) -> tuple[str, ...] | None:
+    morph = _morph_analyzer()
+    if morph is None or not _CYRILLIC.match(word):
+        return None
+    parses = morph.parse(word)
+    if not parses:
+        return None
+    forms = []
+    for case in CASES:
+        inflected = parses[0].inflect({case})
+        forms.append(inflected.word if inflected else word)
+    return tuple(forms)
+
+
+def inflector_name() -> str:
+    return "pymorphy3" if _morph_analyzer() is not None else "rules"
+
+
+def inflect(phrase: str, abbreviations: Iterable[str] = ()) -> list[str]:
+    phrase = phrase.lower()
+    words = phrase.split()
+    if not words:
+        return []
+
+    # Abbreviations such as "США" or "НАТО" are not declined; callers pass them since the phrase is lowercased.
+    keep = set(abbreviations)
+    per_word = [
+        (word,) * len(CASES) if word in keep else _morph_forms(word) or _rule_forms(word) for word in words
+    ]
+    forms = {" ".join(word_forms[case] for word_forms in per_word) for case in range(len(CASES))}
+    forms.discard(phrase)
+    return sorted(forms)
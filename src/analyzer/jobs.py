@@ -0,0 +1,150 @@
+import logging
+import os
+import socket
+from datetime import datetime, timedelta, timezone
+from typing import NamedTuple, cast
+
+from sqlalchemy import CursorResult, delete, or_, select, tuple_, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.analyzer.repository import _insert
+from src.core.metrics import fetch_jobs
+from src.core.postgres import Postgres
+from src.models import FetchJob
+
+logger = logging.getLogger(__name__)
+
+
+class JobLease(NamedTuple):
+    id: int
+    kind: str
+    key: str
+    interval: float
+    attempts: int
+
+
+def default_worker_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+class FetchJobQueue:
+    def __init__(
+        self,
+        postgres: Postgres,
+        worker_id: str | None = None,
+        lease_timeout: float = 600,
+        retry_delay: float = 300,
+    ):
+        self.postgres = postgres
+        self.worker_id = worker_id or default_worker_id()
+        self.lease_timeout = lease_timeout
+        self.retry_delay = retry_delay
+
+    async def sync(self, units: dict[tuple[str, str], float]) -> None:
+        now = datetime.now(timezone.utc)
+        async with self.postgres(f"{self.__class__.__name__}.sync") as session:
+            if units:
+                stmt = _insert(session, FetchJob).values(
+                    [
+                        {"kind": kind, "key": key, "interval": interval, "next_run_at": now, "attempts": 0}
+                        for (kind, key), interval in units.items()
+                    ]
+                )
+                stmt = stmt.on_conflict_do_update(
+                    index_elements=[FetchJob.kind, FetchJob.key],
+                    set_={"interval": stmt.excluded.interval},
+                )
+                await session.execute(stmt)
+            # Units that are no longer configured, e.g. after a query regrouping, stop being scheduled.
+            # Rows leased by a peer are left alone: it may run an older config and still owns them.
+            stale = delete(FetchJob).where(or_(FetchJob.locked_until.is_(None), FetchJob.locked_until < now))
+            if units:
+                stale = stale.where(tuple_(FetchJob.kind, FetchJob.key).not_in(list(units)))
+            removed = cast(CursorResult, await session.execute(stale)).rowcount
+            await session.commit()
+        logger.info(f"Synced {len(units)} fetch jobs, removed {removed} stale ones")
+
+    async def claim(self, limit: int) -> list[JobLease]:
+        now = datetime.now(timezone.utc)
+        # SKIP LOCKED lets concurrent workers pick disjoint rows without waiting on each other;
+        # the lease keeps the job owned after this transaction commits.
+        due = (
+            select(FetchJob.id)
+            .where(
+                FetchJob.next_run_at <= now,
+                or_(FetchJob.locked_until.is_(None), FetchJob.locked_until < now),
+            )
+            .order_by(FetchJob.next_run_at)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        async with self.postgres(f"{self.__class__.__name__}.claim") as session:
+            result = await session.execute(
+                update(FetchJob)
+                .where(FetchJob.id.in_(due.scalar_subquery()))
+                .values(
+                    locked_by=self.worker_id,
+                    locked_until=now + timedelta(seconds=self.lease_timeout),
+                    attempts=FetchJob.attempts + 1,
+                )
+                .returning(FetchJob.id, FetchJob.kind, FetchJob.key, FetchJob.interval, FetchJob.attempts)
+            )
+            jobs = [JobLease(*row) for row in result.all()]
+            await session.commit()
+        reclaimed = sum(1 for job in jobs if job.attempts > 1)
+        fetch_jobs.labels(result="claimed").inc(len(jobs))
+        if jobs:
+            logger.info(f"Claimed {len(jobs)} fetch jobs ({reclaimed} retried or reclaimed)")
+        return jobs
+
+    async def extend(self, jobs: list[JobLease]) -> int:
+        now = datetime.now(timezone.utc)
+        async with self.postgres(f"{self.__class__.__name__}.extend") as session:
+            result = await session.execute(
+                update(FetchJob)
+                .where(FetchJob.id.in_([job.id for job in jobs]), FetchJob.locked_by == self.worker_id)
+                .values(locked_until=now + timedelta(seconds=self.lease_timeout))
+            )
+            await session.commit()
+        extended = cast(CursorResult, result).rowcount
+        if extended < len(jobs):
+            logger.warning(f"Lost the lease on {len(jobs) - extended} fetch jobs")
+        return extended
+
+    async def complete(self, jobs: list[JobLease]) -> None:
+        now = datetime.now(timezone.utc)
+        async with self.postgres(f"{self.__class__.__name__}.complete") as session:
+            for job in jobs:
+                await self._release(
+                    session,
+                    job,
+                    next_run_at=now + timedelta(seconds=job.interval),
+                    attempts=0,
+                    last_error=None,
+                    finished_at=now,
+                )
+            await session.commit()
+        fetch_jobs.labels(result="completed").inc(len(jobs))
+
+    async def release(self, jobs: list[JobLease], error: str | None = None) -> None:
+        now = datetime.now(timezone.utc)
+        async with self.postgres(f"{self.__class__.__name__}.release") as session:
+            for job in jobs:
+                if error is None:
+                    # Handed back on shutdown: due right away for the other workers.
+                    await self._release(session, job, next_run_at=now, attempts=job.attempts - 1)
+                    continue
+                delay = min(self.retry_delay * 2 ** (job.attempts - 1), job.interval)
+                await self._release(
+                    session, job, next_run_at=now + timedelta(seconds=delay), last_error=error
+                )
+            await session.commit()
+        fetch_jobs.labels(result="failed" if error is not None else "released").inc(len(jobs))
+
+    async def _release(self, session: AsyncSession, job: JobLease, **values) -> None:
+        # Only the current lease holder may release: a peer may have reclaimed an expired lease.
+        await session.execute(
+            update(FetchJob)
+            .where(FetchJob.id == job.id, FetchJob.locked_by == self.worker_id)
+            .values(locked_by=None, locked_until=None, **values)
+        )
@@ -0,0 +1,87 @@
+from collections import deque
+from typing import Iterable, Mapping
+
+
+def _is_word_char(ch: str) -> bool:
+    return ch.isalnum() or ch == "_"
+
+
+class EntityMatcher:
+    def __init__(self, entities: Iterable[str] | Mapping[str, str]):
+        if not isinstance(entities, Mapping):
+            entities = {entity: entity for entity in entities}
+        self.patterns: list[str] = list(entities)
+        self.keys: list[str] = [entities[pattern] for pattern in self.patterns]
+        self.entities: list[str] = list(dict.fromkeys(self.keys))
+        self._goto: list[dict[str, int]] = [{}]
+        self._fail: list[int] = [0]
+        self._output: list[tuple[int, ...]] = [()]
+        self._build()
+
+    def _build(self) -> None:
+        for index, pattern in enumerate(self.patterns):
+            state = 0
+            for ch in pattern:
+                next_state = self._goto[state].get(ch)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto[state][ch] = next_state
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._output.append(())
+                state = next_state
+            self._output[state] += (index,)
+
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and ch not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                candidate = self._goto[fallback].get(ch, 0)
+                self._fail[next_state] = candidate if candidate != next_state else 0
+                self._output[next_state] += self._output[self._fail[next_state]]
+
+    def find_spans(self, text: str) -> dict[str, list[tuple[int, int]]]:
+        goto, fail, output = self._goto, self._fail, self._output
+        lengths = [len(pattern) for pattern in self.patterns]
+        keys = self.keys
+        text_len = len(text)
+        spans: dict[str, list[tuple[int, int]]] = {}
+        state = 0
+
+        for pos, ch in enumerate(text):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            if not output[state]:
+                continue
+
+            end = pos + 1
+            if end < text_len and _is_word_char(text[end]):
+                continue
+            for index in output[state]:
+                start = end - lengths[index]
+                if start > 0 and _is_word_char(text[start - 1]):
+                    continue
+                spans.setdefault(keys[index], []).append((start, end))
+
+        matches: dict[str, list[tuple[int, int]]] = {}
+        for key, key_spans in spans.items():
+            kept = matches[key] = []
+            covered = -1
+            for start, end in sorted(key_spans, key=lambda span: (span[0], -span[1])):
+                if start >= covered:
+                    kept.append((start, end))
+                    covered = end
+        return matches
+
+    def find_all(self, text: str) -> dict[str, list[int]]:
+        return {
+            entity: [start for start, _ in spans] for entity, spans in self.find_spans(text).items()
+        }
+
+    def count_all(self, text: str) -> dict[str, int]:
+        return {entity: len(spans) for entity, spans in self.find_spans(text).items()}
@@ -0,0 +1,85 @@
+import re
+from collections import deque
+from hashlib import blake2b
+
+_TOKEN = re.compile(r"\w+")
+_MASK = (1 << 64) - 1
+
+
+def simhash(text: str, shingle_size: int = 2) -> int:
+    tokens = _TOKEN.findall(text.lower())
+    if len(tokens) > shingle_size:
+        shingles = [" ".join(tokens[i:i + shingle_size]) for i in range(len(tokens) - shingle_size + 1)]
+    else:
+        shingles = [" ".join(tokens)]
+
+    weights = [0] * 64
+    for shingle in shingles:
+        value = int.from_bytes(blake2b(shingle.encode("utf-8"), digest_size=8).digest(), "big")
+        for bit in range(64):
+            weights[bit] += 1 if value >> bit & 1 else -1
+
+    fingerprint = 0
+    for bit, weight in enumerate(weights):
+        if weight > 0:
+            fingerprint |= 1 << bit
+    return fingerprint
+
+
+def to_signed(fingerprint: int) -> int:
+    return fingerprint - (1 << 64) if fingerprint >= 1 << 63 else fingerprint
+
+
+def to_unsigned(fingerprint: int) -> int:
+    return fingerprint & _MASK
+
+
+class NearDuplicateIndex:
+    def __init__(self, max_distance: int = 5, capacity: int = 100_000):
+        self.max_distance = max_distance
+        self.capacity = capacity
+        self.bands = max_distance + 1
+        self.band_bits = 64 // self.bands
+        self._band_mask = (1 << self.band_bits) - 1
+        self._buckets: dict[tuple[int, int], list[tuple[int, str]]] = {}
+        self._entries: deque[tuple[int, str]] = deque()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _band_keys(self, fingerprint: int) -> list[tuple[int, int]]:
+        return [
+            (band, fingerprint >> (band * self.band_bits) & self._band_mask)
+            for band in range(self.bands)
+        ]
+
+    def find(self, fingerprint: int) -> str | None:
+        best: tuple[int, str] | None = None
+        for key in self._band_keys(fingerprint):
+            for candidate, cluster_id in self._buckets.get(key, ()):
+                distance = (candidate ^ fingerprint).bit_count()
+                if distance <= self.max_distance and (best is None or distance < best[0]):
+                    best = (distance, cluster_id)
+        return best[1] if best else None
+
+    def add(self, fingerprint: int, cluster_id: str) -> None:
+        entry = (fingerprint, cluster_id)
+        self._entries.append(entry)
+        for key in self._band_keys(fingerprint):
+            self._buckets.setdefault(key, []).append(entry)
+        while len(self._entries) > self.capacity:
+            self._evict(self._entries.popleft())
+
+    def assign(self, fingerprint: int, content_hash: str) -> str:
+        cluster_id = self.find(fingerprint) or content_hash
+        self.add(fingerprint, cluster_id)
+        return cluster_id
+
+    def _evict(self, entry: tuple[int, str]) -> None:
+        for key in self._band_keys(entry[0]):
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                continue
+            bucket.remove(entry)
+            if not bucket:
+                del self._buckets[key]
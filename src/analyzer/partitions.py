@@ -0,0 +1,146 @@
+import logging
+import re
+from datetime import date
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.core.postgres import Postgres
+from src.models import ARTICLE_TEXT
+
+logger = logging.getLogger(__name__)
+
+# Mentions are partitioned by the publication month of their article, so that retention drops
+# both partitions of a month together instead of deleting rows.
+PARTITIONED_TABLES = ("articles", "mentions")
+PARTITION_NAME = re.compile(r"^(articles|mentions)_p(\d{4})_(\d{2})$")
+
+
+def _month_start(value: date) -> date:
+    return value.replace(day=1)
+
+
+def _add_months(value: date, months: int) -> date:
+    month = value.month - 1 + months
+    return date(value.year + month // 12, month % 12 + 1, 1)
+
+
+def _partition_name(table: str, month: date) -> str:
+    return f"{table}_p{month.year:04d}_{month.month:02d}"
+
+
+# Keys and indexes are created after the data is copied, once the old table and its names are gone.
+_KEYS = {
+    "articles": (
+        "ALTER TABLE articles ADD CONSTRAINT articles_pkey PRIMARY KEY (id, published_at)",
+        "ALTER TABLE articles ADD CONSTRAINT articles_content_hash_key UNIQUE (content_hash, published_at)",
+        "ALTER TABLE articles ADD CONSTRAINT articles_url_key UNIQUE (url, published_at)",
+        "CREATE INDEX ix_articles_published_at ON articles (published_at)",
+        "CREATE INDEX ix_articles_source_published_at ON articles (source, published_at)",
+        f"CREATE INDEX ix_articles_text_trgm ON articles USING gin (lower({ARTICLE_TEXT}) gin_trgm_ops)",
+    ),
+    "mentions": (
+        "ALTER TABLE mentions ADD CONSTRAINT mentions_pkey PRIMARY KEY (id, published_at)",
+        "ALTER TABLE mentions ADD CONSTRAINT mentions_entity_id_fkey "
+        "FOREIGN KEY (entity_id) REFERENCES political_entities (id)",
+        "CREATE UNIQUE INDEX ix_mentions_article_entity ON mentions (article_id, entity_id, published_at)",
+        "CREATE INDEX ix_mentions_entity_id ON mentions (entity_id)",
+    ),
+}
+
+
+class ArticlePartitionManager:
+    def __init__(self, postgres: Postgres):
+        self.postgres = postgres
+
+    async def is_partitioned(self, session: AsyncSession, table: str = "articles") -> bool:
+        result = await session.execute(
+            text(f"SELECT 1 FROM pg_partitioned_table WHERE partrelid = '{table}'::regclass")
+        )
+        return result.scalar() is not None
+
+    async def convert(self, months_ahead: int = 3) -> None:
+        async with self.postgres(f"{self.__class__.__name__}.convert") as session:
+            # The foreign key from mentions to articles is dropped for good: on a partitioned articles
+            # it would have to include published_at and every detach would have to check mentions.
+            # Retention keeps them consistent instead by dropping the same month of both tables.
+            await session.execute(text("ALTER TABLE mentions DROP CONSTRAINT IF EXISTS mentions_article_id_fkey"))
+            for table in PARTITIONED_TABLES:
+                if await self.is_partitioned(session, table):
+                    logger.info(f"{table} is already partitioned")
+                    continue
+                await self._convert_table(session, table, months_ahead)
+            await session.commit()
+
+    async def _convert_table(self, session: AsyncSession, table: str, months_ahead: int) -> None:
+        result = await session.execute(text(f"SELECT min(published_at)::date FROM {table}"))
+        first_month = _month_start(result.scalar() or date.today())
+
+        for statement in (
+            f"ALTER SEQUENCE {table}_id_seq OWNED BY NONE",
+            f"ALTER TABLE {table} RENAME TO {table}_legacy",
+            f"CREATE TABLE {table} (LIKE {table}_legacy INCLUDING DEFAULTS) PARTITION BY RANGE (published_at)",
+            f"CREATE TABLE {table}_default PARTITION OF {table} DEFAULT",
+        ):
+            await session.execute(text(statement))
+
+        await self._create_partitions(session, table, first_month, months_ahead)
+
+        for statement in (
+            f"INSERT INTO {table} SELECT * FROM {table}_legacy",
+            f"DROP TABLE {table}_legacy",
+            *_KEYS[table],
+            f"ALTER SEQUENCE {table}_id_seq OWNED BY {table}.id",
+        ):
+            await session.execute(text(statement))
+        logger.info(f"{table} converted to monthly partitions")
+
+    async def ensure_partitions(self, months_ahead: int = 3) -> None:
+        async with self.postgres(f"{self.__class__.__name__}.ensure_partitions") as session:
+            for table in PARTITIONED_TABLES:
+                await self._create_partitions(session, table, _month_start(date.today()), months_ahead)
+            await session.commit()
+
+    async def drop_older_than(self, keep_months: int) -> list[str]:
+        cutoff = _add_months(_month_start(date.today()), -keep_months)
+        dropped = []
+        async with self.postgres(f"{self.__class__.__name__}.drop_older_than") as session:
+            result = await session.execute(
+                text(
+                    "SELECT c.relname FROM pg_inherits i "
+                    "JOIN pg_class c ON c.oid = i.inhrelid "
+                    "WHERE i.inhparent IN ('articles'::regclass, 'mentions'::regclass)"
+                )
+            )
+            names: list[str] = list(result.scalars())
+            partitions: list[tuple[date, bool, str, str]] = []
+            for name in names:
+                match = PARTITION_NAME.match(name)
+                if not match:
+                    continue
+                month = date(int(match.group(2)), int(match.group(3)), 1)
+                if _add_months(month, 1) <= cutoff:
+                    # Mentions of a month go before its articles.
+                    partitions.append((month, match.group(1) != "mentions", match.group(1), name))
+
+            for _, _, table, name in sorted(partitions):
+                await session.execute(text(f"ALTER TABLE {table} DETACH PARTITION {name}"))
+                await session.execute(text(f"DROP TABLE {name}"))
+                await session.commit()
+                dropped.append(name)
+                logger.info(f"Dropped {table} partition {name}")
+
+        return dropped
+
+    @staticmethod
+    async def _create_partitions(session: AsyncSession, table: str, start: date, months_ahead: int) -> None:
+        last = _add_months(_month_start(date.today()), months_ahead)
+        month = start
+        while month <= last:
+            await session.execute(
+                text(
+                    f"CREATE TABLE IF NOT EXISTS {_partition_name(table, month)} PARTITION OF {table} "
+                    f"FOR VALUES FROM ('{month.isoformat()}') TO ('{_add_months(month, 1).isoformat()}')"
+                )
+            )
+            month = _add_months(month, 1)
@@ -1,161 +1,438 @@
+import asyncio
 import logging
-import pandas as pd
-from datetime import datetime, date
-from hashlib import md5
-
-from fastapi import HTTPException
-from starlette import status
+import multiprocessing
+from collections import deque
+from datetime import timedelta
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import AsyncGenerator, AsyncIterator, Iterable
 
+from src.analyzer.dictionary import build_entries, compile_dictionary, merge_entries
+from src.analyzer.engine import MentionColumns, init_worker, match_batch, match_many
+from src.analyzer.near_dup import NearDuplicateIndex, to_signed
 from src.analyzer.repository import AnalyzerRepository
-from src.services.news_api import NewsAPIWorker
+from src.analyzer.seen_index import SeenIndex, canonicalize_url
+from src.core.metrics import articles_total, fetch_errors, fetch_timings, match_timings
+from src.core.resource import AppResource
+from src.services.news_api import NewsAPIWorker, PartialFetch
 from src.services.rss_parser import RSSParser
 
 logger = logging.getLogger(__name__)
 
+_STAGE_DONE = object()
+_FRAME_QUEUE_SIZE = 2
+
+SOURCES = ("newsapi", "rss")
+
+
+def _http_error(detail: str) -> Exception:
+    # fastapi is only imported once something fails: the cron and worker entrypoints never serve HTTP.
+    from fastapi import HTTPException
+    from starlette import status
+
+    return HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=detail)
 
-class MentionAnalyzer:
+
+class MentionAnalyzer(AppResource):
     def __init__(
         self,
         repository: AnalyzerRepository,
         rss_parser: RSSParser,
         news_api: NewsAPIWorker,
         entities: list[str],
+        entity_dictionary: list | None = None,
+        inflect_entities: bool = True,
+        dictionary_cache_dir: str | None = None,
+        news_concurrency: int = 5,
+        incremental: bool = True,
+        fetch_overlap_hours: int = 6,
+        queue_size: int = 1000,
+        batch_size: int = 1000,
+        workers: int = 0,
+        worker_batch_size: int = 200,
+        near_dup_enabled: bool = True,
+        near_dup_max_distance: int = 5,
+        near_dup_capacity: int = 100_000,
+        near_dup_window_hours: int = 48,
+        drop_near_duplicates: bool = False,
     ):
+        self.executor: ProcessPoolExecutor | None = None
         self.repository = repository
         self.rss_parser = rss_parser
         self.news_api = news_api
-        self.entities = self._normalize_entities(entities)
+        self.inflect_entities = inflect_entities
+        self.dictionary_cache_dir = dictionary_cache_dir
+        self._set_dictionary(build_entries(entities, entity_dictionary or []))
+        self.dictionary_synced = False
+        self.news_concurrency = news_concurrency
+        self.incremental = incremental
+        self.fetch_overlap = timedelta(hours=fetch_overlap_hours)
+        self.queue_size = queue_size
+        self.batch_size = batch_size
+        self.seen_index = SeenIndex()
+        self.workers = workers
+        self.worker_batch_size = worker_batch_size
+        self.near_dups = (
+            NearDuplicateIndex(max_distance=near_dup_max_distance, capacity=near_dup_capacity)
+            if near_dup_enabled
+            else None
+        )
+        self.near_dup_window_hours = near_dup_window_hours
+        self.drop_near_duplicates = drop_near_duplicates
+        self.near_dups_loaded = False
+        self.run_lock = asyncio.Lock()
+        self.fetch_failures: dict[tuple[str, str], str] = {}
+        self.fetch_marks = SeenIndex()
+
+    async def disconnect(self) -> None:
+        if self.executor:
+            self.executor.shutdown(wait=True, cancel_futures=True)
 
-    @staticmethod
-    def _normalize_entities(entities: list[str]) -> list[str]:
-        return [e.strip().lower() for e in entities if e.strip()]
+    def _set_dictionary(self, entries: list) -> None:
+        self.dictionary = compile_dictionary(entries, self.inflect_entities, self.dictionary_cache_dir)
+        self.matcher = self.dictionary.matcher
+        self.entities = [entry.name for entry in entries]
+        self.queries = list(
+            dict.fromkeys(term for entry in entries for term in (entry.name, *entry.aliases))
+        )
+        if self.executor:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = None
+
+    def _ensure_executor(self) -> None:
+        if self.workers > 0 and self.executor is None:
+            self.executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=init_worker,
+                initargs=(self.dictionary.forms, self.near_dups is not None),
+            )
 
-    async def fetch_all_articles(self, days: int = 1) -> list[dict]:
+    def fetch_units(self, sources: Iterable[str] | None = None) -> list[tuple[str, str]]:
+        sources = set(SOURCES if sources is None else sources)
+        units: list[tuple[str, str]] = []
+        if "newsapi" in sources:
+            units.extend(("newsapi", query) for query in self.news_api.build_queries(self.queries))
+        if "rss" in sources:
+            units.extend(("rss", url) for url in self.rss_parser.feed_urls)
+        return units
+
+    async def iter_articles(
+        self,
+        days: int = 1,
+        sources: Iterable[str] | None = None,
+        units: list[tuple[str, str]] | None = None,
+    ) -> AsyncIterator[dict]:
         if not self.entities:
             logger.warning("No entities provided for article fetching")
-            return []
+            return
 
-        news_articles = await self._fetch_news_articles(days)
-        rss_articles = await self._fetch_rss_articles()
+        sources = set(SOURCES if sources is None else sources)
+        keys: dict[str, list[str]] = {}
+        if units is not None:
+            sources = {kind for kind, _ in units}
+            keys = {source: [key for kind, key in units if kind == source] for source in sources}
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
 
-        all_articles = news_articles + rss_articles
-        logger.info(f"Total articles fetched: {len(all_articles)}")
-        return all_articles
-
-    async def _fetch_news_articles(self, days: int) -> list[dict]:
-        articles = []
-        for entity in self.entities:
+        async def produce(batches: AsyncGenerator[list[dict], None]) -> None:
             try:
-                news = await self.news_api.fetch_news(query=entity, days=days)
-                articles.extend(news)
-                logger.debug(f"Fetched {len(news)} articles for entity: {entity}")
+                async for batch in batches:
+                    for article in batch:
+                        await queue.put(article)
             except Exception as e:
-                logger.warning(f"Failed to fetch news for entity {entity}: {str(e)}")
-        return articles
+                logger.warning(f"Article producer failed: {str(e)}")
+            finally:
+                await batches.aclose()
+            # Not reached on cancellation: the consumer is gone and a full queue would block forever.
+            await queue.put(_STAGE_DONE)
 
-    async def _fetch_rss_articles(self) -> list[dict]:
+        producers = []
+        if "newsapi" in sources:
+            news = self._iter_news_articles(days, keys.get("newsapi"))
+            producers.append(asyncio.create_task(produce(news)))
+        if "rss" in sources:
+            rss = self._iter_rss_articles(keys.get("rss"), days)
+            producers.append(asyncio.create_task(produce(rss)))
+        remaining = len(producers)
+        fetched = 0
         try:
-            rss_articles = await self.rss_parser.fetch_news()
-            logger.debug(f"Fetched {len(rss_articles)} RSS articles")
-            return rss_articles
-        except Exception as e:
-            logger.warning(f"Failed to fetch RSS articles: {str(e)}")
-            return []
+            while remaining:
+                article = await queue.get()
+                if article is _STAGE_DONE:
+                    remaining -= 1
+                    continue
+                fetched += 1
+                yield article
+        finally:
+            for producer in producers:
+                producer.cancel()
+            await asyncio.gather(*producers, return_exceptions=True)
+            articles_total.labels(stage="fetched").inc(fetched)
+            logger.info(f"Total articles fetched: {fetched}")
+
+    async def _iter_news_articles(
+        self, days: int, queries: list[str] | None = None
+    ) -> AsyncGenerator[list[dict], None]:
+        if self.news_api.replaying:
+            async for articles in self.news_api.iter_replay(days):
+                yield articles
+            return
+
+        semaphore = asyncio.Semaphore(self.news_concurrency)
 
-    async def analyze(self, days: int = 1) -> pd.DataFrame:
+        async def fetch_query(query: str) -> list[dict]:
+            unit = ("newsapi", query)
+            since = self.seen_index.fetch_since(unit, self.fetch_overlap) if self.incremental else None
+            async with semaphore:
+                try:
+                    with fetch_timings.labels(fetcher="newsapi", source=query).time():
+                        news = await self.news_api.fetch_news(query=query, days=days, since=since)
+                    logger.debug(f"Fetched {len(news)} articles for query: {query}")
+                    for article in news:
+                        self.fetch_marks.advance(unit, article.get("published_at"))
+                    return news
+                except PartialFetch as e:
+                    # Keeps what was read but leaves the mark alone, so the retry asks for the missing pages.
+                    fetch_errors.labels(fetcher="newsapi", source=query).inc()
+                    logger.warning(f"Fetched {len(e.articles)} articles for query {query} partially: {str(e)}")
+                    self.fetch_failures[("newsapi", query)] = str(e)
+                    return e.articles
+                except Exception as e:
+                    fetch_errors.labels(fetcher="newsapi", source=query).inc()
+                    logger.warning(f"Failed to fetch news for query {query}: {str(e)}")
+                    self.fetch_failures[("newsapi", query)] = str(e)
+                    return []
+
+        if queries is None:
+            queries = self.news_api.build_queries(self.queries)
+        tasks = [asyncio.create_task(fetch_query(query)) for query in queries]
         try:
-            articles = await self.fetch_all_articles(days=days)
+            for future in asyncio.as_completed(tasks):
+                yield await future
+        finally:
+            for task in tasks:
+                task.cancel()
 
-            if not articles:
-                logger.warning("No articles to analyze")
-                return pd.DataFrame()
+    async def _iter_rss_articles(
+        self, urls: list[str] | None = None, days: int | None = None
+    ) -> AsyncGenerator[list[dict], None]:
+        urls = self.rss_parser.feed_urls if urls is None else urls
+        feeds = self.rss_parser.iter_news(urls, days)
+        try:
+            async for rss_articles in feeds:
+                logger.debug(f"Fetched {len(rss_articles)} RSS articles")
+                yield rss_articles
+        except Exception as e:
+            logger.warning(f"Failed to fetch RSS articles: {str(e)}")
+            self.fetch_failures.update({("rss", url): str(e) for url in urls})
+        else:
+            self.fetch_failures.update(
+                {("rss", url): error for url, error in self.rss_parser.feed_errors.items() if url in urls}
+            )
+        finally:
+            await feeds.aclose()
 
-            data = []
-            processed_urls = set()
+    async def load_dictionary(self) -> None:
+        if self.dictionary_synced:
+            return
+        stored = await self.repository.load_entity_dictionary()
+        entries = merge_entries(self.dictionary.entries, stored)
+        if entries != self.dictionary.entries:
+            self._set_dictionary(entries)
+        await self.repository.sync_entity_dictionary(self.dictionary)
+        self.dictionary_synced = True
+        logger.info(
+            f"Loaded entity dictionary with {len(self.entities)} entities "
+            f"and {len(self.dictionary.forms)} forms"
+        )
 
-            for article in articles:
-                try:
-                    if not article.get("title") or not article.get("content"):
-                        continue
+    async def prepare(self) -> None:
+        await self.load_dictionary()
+        await self.load_seen_index()
+        self._ensure_executor()
 
-                    article_url = article.get("url", "")
-                    if article_url in processed_urls:
-                        continue
-                    processed_urls.add(article_url)
-
-                    full_text = f"{article['title']} {article['content']}".lower()
-                    article_date = self._parse_date(article.get("published_at"))
-                    source = article.get("source", "unknown")
-                    content_hash = self._generate_content_hash(full_text)
-
-                    for entity in self.entities:
-                        count = full_text.count(entity)
-                        if count > 0:
-                            start_pos = full_text.find(entity)
-                            snippet = self._get_snippet(full_text, start_pos, entity)
-
-                            data.append(
-                                {
-                                    "date": article_date,
-                                    "entity": entity,
-                                    "count": count,
-                                    "source": source,
-                                    "snippet": snippet,
-                                    "article_url": article_url,
-                                    "title": article["title"],
-                                    "content_hash": content_hash,
-                                }
-                            )
+    async def load_seen_index(self) -> None:
+        if self.incremental and not self.seen_index.loaded:
+            await self.repository.load_seen_index(self.seen_index)
+            logger.info(f"Loaded seen index with {len(self.seen_index)} articles")
+        if self.near_dups is not None and not self.near_dups_loaded:
+            await self.repository.load_near_duplicates(self.near_dups, self.near_dup_window_hours)
+            self.near_dups_loaded = True
+            logger.info(f"Loaded near-duplicate index with {len(self.near_dups)} fingerprints")
 
-                except Exception as e:
-                    logger.warning(f"Failed to process article: {str(e)}")
-                    continue
+    async def analyze(
+        self,
+        days: int = 1,
+        sources: Iterable[str] | None = None,
+        units: list[tuple[str, str]] | None = None,
+    ) -> int:
+        if self.run_lock.locked():
+            logger.warning("Analysis is already running, skipping")
+            return 0
+        async with self.run_lock:
+            return await self._analyze(days, sources, units)
 
-            df = pd.DataFrame(data)
+    async def _analyze(
+        self, days: int, sources: Iterable[str] | None, units: list[tuple[str, str]] | None = None
+    ) -> int:
+        self.fetch_failures = {}
+        self.fetch_marks = SeenIndex()
+        try:
+            await self.prepare()
+            self.repository.reset_article_cache()
 
-            if not df.empty:
-                try:
-                    await self.repository.save_analysis_results(df)
-                    logger.info(f"Successfully saved {len(df)} mentions")
-                except Exception as e:
-                    logger.error(f"Failed to save analysis results: {str(e)}")
-                    raise HTTPException(
-                        status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                        detail="Failed to save analysis results",
-                    )
+            frames: asyncio.Queue = asyncio.Queue(maxsize=_FRAME_QUEUE_SIZE)
+            match_task = asyncio.create_task(
+                self._match_stage(self.iter_articles(days, sources, units), frames)
+            )
+            save_task = asyncio.create_task(self._save_stage(frames))
+            try:
+                _, saved = await asyncio.gather(match_task, save_task)
+            except BaseException:
+                match_task.cancel()
+                save_task.cancel()
+                raise
+            await self.rss_parser.commit_state()
+            if self.incremental:
+                self.seen_index.merge(self.fetch_marks)
+
+            if saved:
+                logger.info(f"Successfully saved {saved} mentions")
             else:
                 logger.info("No mentions found in articles")
+            return saved
 
-            return df
-
-        except HTTPException:
-            raise
         except Exception as e:
+            from fastapi import HTTPException
+
+            if isinstance(e, HTTPException):
+                raise
             logger.error(f"Analysis failed: {str(e)}")
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail="Analysis failed",
-            )
+            raise _http_error("Analysis failed")
+
+    async def _match_stage(self, articles: AsyncIterator[dict], frames: asyncio.Queue) -> None:
+        run_index = SeenIndex()
+        pending = SeenIndex()
+        columns = MentionColumns(fingerprints=self.near_dups is not None)
+        seen_count = 0
+        near_dup_count = 0
+
+        async for admitted, results in self._match_articles(articles, run_index):
+            for article, result in zip(admitted, results):
+                if result is None:
+                    continue
+
+                content_hash, fingerprint = result.content_hash, result.fingerprint
+                if self.seen_index.has_hash(content_hash) or run_index.has_hash(content_hash):
+                    seen_count += 1
+                    continue
+
+                canonical_url = canonicalize_url(article.get("link") or article.get("url", ""))
+                run_index.add(canonical_url, content_hash)
+                pending.add(canonical_url, content_hash)
+
+                signed_fingerprint, cluster_id = None, None
+                if self.near_dups is not None and fingerprint is not None:
+                    cluster_id = self.near_dups.assign(fingerprint, content_hash)
+                    if cluster_id != content_hash and self.drop_near_duplicates:
+                        near_dup_count += 1
+                        continue
+                    signed_fingerprint = to_signed(fingerprint)
+
+                if columns.append(article, result, signed_fingerprint, cluster_id):
+                    articles_total.labels(stage="matched").inc()
 
-    @staticmethod
-    def _parse_date(date_obj) -> date | None:
-        if isinstance(date_obj, date):
-            return date_obj
-        if isinstance(date_obj, datetime):
-            return date_obj.date()
+            if len(columns) >= self.batch_size:
+                await frames.put((columns.to_frame(), pending))
+                columns, pending = MentionColumns(fingerprints=self.near_dups is not None), SeenIndex()
+
+        await frames.put((columns.to_frame(), pending))
+        await frames.put(None)
+        articles_total.labels(stage="deduped").inc(seen_count + near_dup_count)
+        logger.info(f"Skipped {seen_count} duplicate and {near_dup_count} near-duplicate articles")
+
+    async def _match_articles(
+        self, articles: AsyncIterator[dict], run_index: SeenIndex
+    ) -> AsyncIterator[tuple[list[dict], list]]:
+        batch: list[dict] = []
+        in_flight: deque[tuple[list[dict], asyncio.Future, ProcessPoolExecutor | None]] = deque()
+        skipped = 0
+
+        async for article in articles:
+            if not self._admit(article, run_index):
+                skipped += 1
+                continue
+
+            if self.executor is None:
+                yield [article], self._match_inline([article])
+                continue
+
+            batch.append(article)
+            if len(batch) >= self.worker_batch_size:
+                in_flight.append(self._submit_batch(batch))
+                batch = []
+            if len(in_flight) >= self.workers:
+                yield await self._collect_batch(*in_flight.popleft())
+
+        if batch and self.executor is not None:
+            in_flight.append(self._submit_batch(batch))
+        while in_flight:
+            yield await self._collect_batch(*in_flight.popleft())
+
+        articles_total.labels(stage="deduped").inc(skipped)
+        logger.info(f"Skipped {skipped} already seen articles")
+
+    def _match_inline(self, articles: list[dict]) -> list:
+        with match_timings.labels(mode="inline").time():
+            return match_many(self.matcher, articles, self.near_dups is not None)
+
+    def _reset_executor(self, executor: ProcessPoolExecutor | None, error: Exception) -> None:
+        # A crashed worker breaks the whole pool; the next batches go to a fresh one.
+        if executor is not None and self.executor is executor:
+            logger.error(f"Worker pool is broken, recreating it: {str(error)}")
+            executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = None
+            self._ensure_executor()
+
+    def _submit_batch(self, batch: list[dict]) -> tuple[list[dict], asyncio.Future, ProcessPoolExecutor | None]:
+        loop = asyncio.get_running_loop()
         try:
-            return pd.to_datetime(date_obj).date()
-        except (ValueError, TypeError):
-            return datetime.now().date()
+            future = loop.run_in_executor(self.executor, match_batch, batch)
+        except BrokenProcessPool as e:
+            self._reset_executor(self.executor, e)
+            future = loop.run_in_executor(self.executor, match_batch, batch)
+        return batch, future, self.executor
 
+    async def _collect_batch(
+        self, batch: list[dict], future: asyncio.Future, executor: ProcessPoolExecutor | None
+    ) -> tuple[list[dict], list]:
+        try:
+            with match_timings.labels(mode="process_pool").time():
+                return batch, await future
+        except BrokenProcessPool as e:
+            self._reset_executor(executor, e)
+        except Exception as e:
+            logger.warning(f"Failed to process batch of {len(batch)} articles in the worker pool: {str(e)}")
+        # The batch URLs are already in the run index, so the batch is matched here rather than dropped.
+        return batch, self._match_inline(batch)
 
-    @staticmethod
-    def _generate_content_hash(text: str) -> str:
-        return md5(text.strip().encode("utf-8")).hexdigest()
+    def _admit(self, article: dict, run_index: SeenIndex) -> bool:
+        canonical_url = canonicalize_url(article.get("link") or article.get("url", ""))
+        if self.seen_index.has_url(canonical_url) or run_index.has_url(canonical_url):
+            return False
+        run_index.add_url(canonical_url)
+        return True
 
-    @staticmethod
-    def _get_snippet(text: str, pos: int, entity: str, window: int = 50) -> str:
-        start = max(0, pos - window)
-        end = min(len(text), pos + len(entity) + window)
-        snippet = text[start:end]
-        return snippet.replace(entity, f"[{entity}]").strip()
+    async def _save_stage(self, frames: asyncio.Queue) -> int:
+        saved = 0
+        while (item := await frames.get()) is not None:
+            df, pending = item
+            if not df.empty:
+                try:
+                    saved += await self.repository.save_analysis_results(df)
+                except Exception as e:
+                    logger.error(f"Failed to save analysis results: {str(e)}")
+                    raise _http_error("Failed to save analysis results")
+            if self.incremental:
+                self.seen_index.merge(pending)
+        return saved
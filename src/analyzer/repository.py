@@ -1,32 +1,344 @@
-from datetime import datetime, timedelta
+import logging
+from datetime import date, datetime, time, timedelta, timezone
+from typing import TYPE_CHECKING, AsyncIterator, Iterable, Sequence
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_, func
+from sqlalchemy import Integer, select, and_, or_, func, literal_column, text
+from src.analyzer.dictionary import CompiledDictionary, EntityEntry
+from src.analyzer.near_dup import NearDuplicateIndex, to_unsigned
+from src.analyzer.seen_index import SeenIndex, canonicalize_url
+from src.analyzer.snippets import make_snippets
+from src.core.cache import LRUCache
+from src.core.metrics import commit_timings, rows_written
 from src.core.postgres import Postgres
-from src.models import Article, PoliticalEntity, Mention
-import pandas as pd
+from src.models import ARTICLE_TEXT, Article, EntityAlias, PoliticalEntity, Mention, MentionRollup
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+ROLLUP_GRANULARITIES = ("hour", "day")
+RESULTS_CHANNEL = "analyzer_results"
+TIMESERIES_BUCKETS = {
+    "15m": 900,
+    "30m": 1800,
+    "1h": 3600,
+    "3h": 10800,
+    "6h": 21600,
+    "12h": 43200,
+    "1d": 86400,
+    "1w": 604800,
+}
+SMOOTHING_METHODS = ("sma", "ema")
+# 2000-01-03 is a Monday, so weekly buckets start on Mondays.
+BUCKET_ORIGIN = "2000-01-03 00:00:00+00"
+BUCKET_ORIGIN_EPOCH = 946857600
+
+logger = logging.getLogger(__name__)
+
+
+def _insert(session: AsyncSession, model: type):
+    if session.get_bind().dialect.name == "sqlite":
+        return sqlite.insert(model)
+    return postgresql.insert(model)
+
+
+def _time_bucket(session: AsyncSession, column, seconds: int):
+    if session.get_bind().dialect.name == "sqlite":
+        epoch = func.cast(func.strftime("%s", column), Integer) - BUCKET_ORIGIN_EPOCH
+        return func.datetime(epoch // seconds * seconds + BUCKET_ORIGIN_EPOCH, "unixepoch")
+    return func.date_bin(
+        literal_column(f"interval '{seconds} seconds'"),
+        column,
+        literal_column(f"TIMESTAMPTZ '{BUCKET_ORIGIN}'"),
+    )
+
+
+def _smooth(points: list[tuple[datetime, int]], seconds: int, method: str, window: int) -> "pd.DataFrame":
+    import pandas as pd
+
+    series = pd.Series(
+        [mentions for _, mentions in points],
+        index=pd.DatetimeIndex([bucket for bucket, _ in points]),
+        dtype="float64",
+    ).asfreq(pd.Timedelta(seconds=seconds), fill_value=0)
+    if method == "ema":
+        smoothed = series.ewm(span=window, adjust=False).mean()
+    else:
+        smoothed = series.rolling(window, min_periods=1).mean()
+    return pd.DataFrame({"mentions": series.astype("int64"), "smoothed": smoothed.round(3)})
+
+
+def _rollup_bucket(value: date, granularity: str) -> datetime:
+    if not isinstance(value, datetime):
+        value = datetime.combine(value, time.min)
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    else:
+        value = value.astimezone(timezone.utc)
+    if granularity == "day":
+        return value.replace(hour=0, minute=0, second=0, microsecond=0)
+    return value.replace(minute=0, second=0, microsecond=0)
 
 
 class AnalyzerRepository:
-    def __init__(self, postgres: Postgres):
+    def __init__(
+        self,
+        postgres: Postgres,
+        bulk_save: bool = True,
+        chunk_size: int = 1000,
+        article_cache_size: int = 10_000,
+        entity_cache_size: int = 100_000,
+    ):
         self.postgres = postgres
+        self.bulk_save = bulk_save
+        self.chunk_size = chunk_size
+        self.entity_ids = LRUCache("entity_ids", maxsize=entity_cache_size)
+        self.entity_ids_loaded = False
+        # Keyed by content_hash; the publication time is kept with the id since mentions are partitioned by it.
+        self.articles = LRUCache("articles", maxsize=article_cache_size)
+
+    async def save_analysis_results(self, df: "pd.DataFrame") -> int:
+        if self.bulk_save:
+            return await self.bulk_save_analysis_results(df)
 
-    async def save_analysis_results(self, df: pd.DataFrame) -> int:
         async with self.postgres(f"{self.__class__.__name__}.save_analysis_results") as session:
+            await self._load_entity_ids(session)
             count = 0
-            for record in df.to_dict("records"):
-                article = await self._get_or_create_article(session, record)
-                entity = await self._get_or_create_entity(session, record["entity"])
-                await self._create_or_update_mention(
-                    session, article, entity, record
+            rollup_rows = []
+            try:
+                for record in df.to_dict("records"):
+                    article = await self._get_or_create_article(session, record)
+                    entity_id = await self._get_or_create_entity(session, record["entity"])
+                    if await self._create_mention(session, article, entity_id, record):
+                        rollup_rows.append((entity_id, record["source"], record["date"], record["count"]))
+                    count += 1
+
+                await self._upsert_rollups(session, rollup_rows)
+                await self._notify_results(session)
+                with commit_timings.labels(metric="save_analysis_results").time():
+                    await session.commit()
+            except BaseException:
+                self._invalidate_caches()
+                raise
+            rows_written.labels(table="mentions").inc(len(rollup_rows))
+            return count
+
+    async def bulk_save_analysis_results(self, df: "pd.DataFrame") -> int:
+        records = df.to_dict("records")
+        async with self.postgres(f"{self.__class__.__name__}.bulk_save_analysis_results") as session:
+            await self._load_entity_ids(session)
+            count = 0
+            for start in range(0, len(records), self.chunk_size):
+                chunk = records[start:start + self.chunk_size]
+                with commit_timings.labels(metric="bulk_save_analysis_results").time():
+                    articles = self._cached_ids(self.articles, (r["content_hash"] for r in chunk))
+                    entity_ids = self._cached_ids(self.entity_ids, (r["entity"] for r in chunk))
+                    new_articles = await self._upsert_articles(
+                        session,
+                        [r for r in chunk if r["content_hash"] not in articles],
+                    )
+                    new_entities = await self._upsert_entities(
+                        session, [r for r in chunk if r["entity"] not in entity_ids]
+                    )
+                    articles.update(new_articles)
+                    entity_ids.update(new_entities)
+                    inserted = await self._insert_mentions(session, chunk, articles, entity_ids)
+                    await self._upsert_rollups(
+                        session,
+                        [
+                            (entity_ids[record["entity"]], record["source"], record["date"], record["count"])
+                            for record in chunk
+                            if (articles[record["content_hash"]][0], entity_ids[record["entity"]]) in inserted
+                        ],
+                    )
+                    await self._notify_results(session)
+                    await session.commit()
+                for content_hash, article in new_articles.items():
+                    self.articles.set(content_hash, article)
+                for name, entity_id in new_entities.items():
+                    self.entity_ids.set(name, entity_id)
+                rows_written.labels(table="articles").inc(len(new_articles))
+                rows_written.labels(table="mentions").inc(len(inserted))
+                count += len(chunk)
+
+            return count
+
+    async def load_seen_index(self, index: SeenIndex) -> SeenIndex:
+        async with self.postgres(f"{self.__class__.__name__}.load_seen_index") as session:
+            result = await session.stream(
+                select(Article.url, Article.content_hash).execution_options(yield_per=10000)
+            )
+            async for row in result:
+                index.add(canonicalize_url(row.url), row.content_hash)
+
+            index.loaded = True
+            return index
+
+    async def load_entity_dictionary(self) -> list[EntityEntry]:
+        async with self.postgres(f"{self.__class__.__name__}.load_entity_dictionary") as session:
+            result = await session.execute(
+                select(PoliticalEntity.name, PoliticalEntity.type, EntityAlias.alias)
+                .outerjoin(
+                    EntityAlias,
+                    and_(EntityAlias.entity_id == PoliticalEntity.id, EntityAlias.kind == "alias"),
                 )
-                count += 1
+                .order_by(PoliticalEntity.id, EntityAlias.id)
+            )
+            entries: dict[str, EntityEntry] = {}
+            for name, entity_type, alias in result.all():
+                entry = entries.get(name) or EntityEntry(name, entity_type)
+                if alias is not None:
+                    entry = EntityEntry(name, entry.type, entry.aliases + (alias,))
+                entries[name] = entry
+            return list(entries.values())
+
+    async def sync_entity_dictionary(self, dictionary: CompiledDictionary) -> None:
+        async with self.postgres(f"{self.__class__.__name__}.sync_entity_dictionary") as session:
+            stmt = _insert(session, PoliticalEntity).values(
+                [{"name": entry.name, "type": entry.type} for entry in dictionary.entries]
+            )
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[PoliticalEntity.name],
+                set_={"type": func.coalesce(stmt.excluded.type, PoliticalEntity.type)},
+            ).returning(PoliticalEntity.id, PoliticalEntity.name)
+            entity_ids = {row.name: row.id for row in (await session.execute(stmt)).all()}
 
+            aliases = [
+                {"entity_id": entity_ids[name], "alias": form, "kind": dictionary.kinds[form]}
+                for form, name in dictionary.forms.items()
+            ]
+            for start in range(0, len(aliases), self.chunk_size):
+                stmt = _insert(session, EntityAlias).values(aliases[start:start + self.chunk_size])
+                # The compiled dictionary is authoritative: a form stored earlier under another entity is repointed.
+                stmt = stmt.on_conflict_do_update(
+                    index_elements=[EntityAlias.alias],
+                    set_={"entity_id": stmt.excluded.entity_id, "kind": stmt.excluded.kind},
+                )
+                await session.execute(stmt)
             await session.commit()
-            return count
+            for name, entity_id in entity_ids.items():
+                self.entity_ids.set(name, entity_id)
+
+    def reset_article_cache(self) -> None:
+        if self.articles.hits or self.articles.misses:
+            logger.info(
+                f"Repository caches: articles {self.articles.hits} hits / {self.articles.misses} misses, "
+                f"entities {self.entity_ids.hits} hits / {self.entity_ids.misses} misses"
+            )
+        self.articles.clear()
+
+    async def _load_entity_ids(self, session: AsyncSession) -> None:
+        if self.entity_ids_loaded:
+            return
+        result = await session.execute(select(PoliticalEntity.id, PoliticalEntity.name))
+        for row in result.all():
+            self.entity_ids.set(row.name, row.id)
+        self.entity_ids_loaded = True
 
-    async def get_mentions_stats(self, days: int = 7) -> list[dict]:
-        async with self.postgres(f"{self.__class__.__name__}.get_mentions_stats") as session:
+    def _invalidate_caches(self) -> None:
+        self.articles.clear()
+        self.entity_ids.clear()
+        self.entity_ids_loaded = False
+
+    @staticmethod
+    def _cached_ids(cache: LRUCache, keys: Iterable[str]) -> dict:
+        ids = {}
+        for key in dict.fromkeys(keys):
+            cached = cache.get(key)
+            if cached is not None:
+                ids[key] = cached
+        return ids
+
+    async def get_entity_ids(self, names: Iterable[str]) -> dict[str, int]:
+        async with self.postgres(f"{self.__class__.__name__}.get_entity_ids") as session:
             result = await session.execute(
+                select(PoliticalEntity.id, PoliticalEntity.name).where(PoliticalEntity.name.in_(list(names)))
+            )
+            return {row.name: row.id for row in result.all()}
+
+    async def get_entities_without_mentions(self, names: list[str]) -> list[str]:
+        async with self.postgres(f"{self.__class__.__name__}.get_entities_without_mentions") as session:
+            result = await session.execute(
+                select(PoliticalEntity.name)
+                .join(Mention, Mention.entity_id == PoliticalEntity.id)
+                .where(PoliticalEntity.name.in_(names))
+                .distinct()
+            )
+            mentioned = set(result.scalars())
+            return [name for name in names if name not in mentioned]
+
+    async def iter_backfill_candidates(
+        self, patterns: list[str], since: datetime, batch_size: int = 1000
+    ) -> AsyncIterator[Sequence]:
+        article_text = func.lower(literal_column(ARTICLE_TEXT))
+        async with self.postgres(f"{self.__class__.__name__}.iter_backfill_candidates") as session:
+            result = await session.stream(
+                select(Article.id, Article.title, Article.content, Article.source, Article.published_at)
+                .where(
+                    Article.published_at >= since,
+                    or_(*[article_text.like(pattern, escape="\\") for pattern in patterns]),
+                )
+                .execution_options(yield_per=batch_size)
+            )
+            async for rows in result.partitions(batch_size):
+                yield rows
+
+    async def save_backfill_mentions(self, rows: list[dict]) -> int:
+        if not rows:
+            return 0
+        async with self.postgres(f"{self.__class__.__name__}.save_backfill_mentions") as session:
+            inserted: set[tuple[int, int]] = set()
+            for start in range(0, len(rows), self.chunk_size):
+                stmt = _insert(session, Mention).values(
+                    [
+                        {
+                            "article_id": row["article_id"],
+                            "entity_id": row["entity_id"],
+                            "published_at": row["published_at"],
+                            "count": row["count"],
+                            "offsets": row["offsets"],
+                        }
+                        for row in rows[start:start + self.chunk_size]
+                    ]
+                )
+                stmt = stmt.on_conflict_do_nothing(
+                    index_elements=[Mention.article_id, Mention.entity_id, Mention.published_at]
+                ).returning(Mention.article_id, Mention.entity_id)
+                inserted.update((row.article_id, row.entity_id) for row in (await session.execute(stmt)).all())
+
+            await self._upsert_rollups(
+                session,
+                [
+                    (row["entity_id"], row["source"], row["published_at"], row["count"])
+                    for row in rows
+                    if (row["article_id"], row["entity_id"]) in inserted
+                ],
+            )
+            await self._notify_results(session)
+            with commit_timings.labels(metric="save_backfill_mentions").time():
+                await session.commit()
+            rows_written.labels(table="mentions").inc(len(inserted))
+            return len(inserted)
+
+    async def load_near_duplicates(self, index: NearDuplicateIndex, hours: int) -> NearDuplicateIndex:
+        async with self.postgres(f"{self.__class__.__name__}.load_near_duplicates") as session:
+            result = await session.stream(
+                select(Article.simhash, Article.cluster_id, Article.content_hash)
+                .where(
+                    Article.simhash.is_not(None),
+                    Article.published_at >= datetime.now(timezone.utc) - timedelta(hours=hours),
+                )
+                .order_by(Article.published_at)
+                .execution_options(yield_per=10000)
+            )
+            async for row in result:
+                index.add(to_unsigned(row.simhash), row.cluster_id or row.content_hash)
+            return index
+
+    async def get_mentions_stats(self, days: int = 7, dedup: bool = False) -> list[dict]:
+        if dedup:
+            since = datetime.now(timezone.utc) - timedelta(days=days)
+            query = (
                 select(
                     PoliticalEntity.name,
                     Article.source,
@@ -34,9 +346,24 @@ class AnalyzerRepository:
                 )
                 .join(Mention.entity)
                 .join(Mention.article)
-                .where(Article.published_at >= datetime.now() - timedelta(days=days))
+                .where(Article.published_at >= since, self._canonical_article(since))
                 .group_by(PoliticalEntity.name, Article.source)
             )
+        else:
+            since = _rollup_bucket(datetime.now(timezone.utc) - timedelta(days=days), "hour")
+            query = (
+                select(
+                    PoliticalEntity.name,
+                    MentionRollup.source,
+                    func.sum(MentionRollup.mentions).label("total_mentions"),
+                )
+                .join(PoliticalEntity, PoliticalEntity.id == MentionRollup.entity_id)
+                .where(MentionRollup.granularity == "hour", MentionRollup.bucket >= since)
+                .group_by(PoliticalEntity.name, MentionRollup.source)
+            )
+
+        async with self.postgres(f"{self.__class__.__name__}.get_mentions_stats", read_only=True) as session:
+            result = await session.execute(query)
             return [
                 {
                     "entity": row.name,
@@ -46,65 +373,433 @@ class AnalyzerRepository:
                 for row in result.all()
             ]
 
+    async def get_mentions_timeseries(
+        self,
+        days: int = 30,
+        granularity: str = "day",
+        entity: str | None = None,
+        source: str | None = None,
+    ) -> list[dict]:
+        if granularity not in ROLLUP_GRANULARITIES:
+            raise ValueError(f"Unsupported granularity: {granularity}")
+
+        since = _rollup_bucket(datetime.now(timezone.utc) - timedelta(days=days), granularity)
+        query = (
+            select(
+                PoliticalEntity.name,
+                MentionRollup.source,
+                MentionRollup.bucket,
+                MentionRollup.mentions,
+            )
+            .join(PoliticalEntity, PoliticalEntity.id == MentionRollup.entity_id)
+            .where(MentionRollup.granularity == granularity, MentionRollup.bucket >= since)
+            .order_by(PoliticalEntity.name, MentionRollup.source, MentionRollup.bucket)
+        )
+        if entity is not None:
+            query = query.where(PoliticalEntity.name == entity)
+        if source is not None:
+            query = query.where(MentionRollup.source == source)
+
+        async with self.postgres(f"{self.__class__.__name__}.get_mentions_timeseries", read_only=True) as session:
+            result = await session.execute(query)
+            return [
+                {
+                    "entity": row.name,
+                    "source": row.source,
+                    "bucket": row.bucket,
+                    "mentions": row.mentions,
+                }
+                for row in result.all()
+            ]
+
+    async def iter_timeseries(
+        self,
+        days: int = 30,
+        bucket: str = "1h",
+        entity: str | None = None,
+        source: str | None = None,
+        smoothing: str | None = None,
+        window: int = 3,
+    ) -> AsyncIterator[dict]:
+        if bucket not in TIMESERIES_BUCKETS:
+            raise ValueError(f"Unsupported bucket: {bucket}")
+        if smoothing is not None and smoothing not in SMOOTHING_METHODS:
+            raise ValueError(f"Unsupported smoothing: {smoothing}")
+        seconds = TIMESERIES_BUCKETS[bucket]
+        since = datetime.now(timezone.utc) - timedelta(days=days)
+
+        async with self.postgres(f"{self.__class__.__name__}.iter_timeseries", read_only=True) as session:
+            if seconds % 3600 == 0:
+                # Whole hours and days are served from the pre-aggregated rollups.
+                granularity = "day" if seconds % 86400 == 0 else "hour"
+                bucket_column = _time_bucket(session, MentionRollup.bucket, seconds).label("bucket")
+                query = (
+                    select(
+                        PoliticalEntity.name,
+                        MentionRollup.source,
+                        bucket_column,
+                        func.sum(MentionRollup.mentions).label("mentions"),
+                    )
+                    .join(PoliticalEntity, PoliticalEntity.id == MentionRollup.entity_id)
+                    .where(
+                        MentionRollup.granularity == granularity,
+                        MentionRollup.bucket >= _rollup_bucket(since, granularity),
+                    )
+                    .group_by(PoliticalEntity.name, MentionRollup.source, bucket_column)
+                )
+                source_column = MentionRollup.source
+            else:
+                bucket_column = _time_bucket(session, Article.published_at, seconds).label("bucket")
+                query = (
+                    select(
+                        PoliticalEntity.name,
+                        Article.source,
+                        bucket_column,
+                        func.sum(Mention.count).label("mentions"),
+                    )
+                    .join(Mention.entity)
+                    .join(Mention.article)
+                    .where(Article.published_at >= since)
+                    .group_by(PoliticalEntity.name, Article.source, bucket_column)
+                )
+                source_column = Article.source
+            if entity is not None:
+                query = query.where(PoliticalEntity.name == entity)
+            if source is not None:
+                query = query.where(source_column == source)
+            query = query.order_by(PoliticalEntity.name, source_column, bucket_column)
+
+            result = await session.stream(query.execution_options(yield_per=5000))
+            series_key = None
+            points: list[tuple[datetime, int]] = []
+            async for row in result:
+                value = row.bucket
+                if isinstance(value, str):
+                    value = datetime.fromisoformat(value).replace(tzinfo=timezone.utc)
+                if smoothing is None:
+                    yield {"entity": row.name, "source": row.source, "bucket": value, "mentions": row.mentions}
+                    continue
+                if (row.name, row.source) != series_key:
+                    for point in self._smoothed_points(series_key, points, seconds, smoothing, window):
+                        yield point
+                    series_key, points = (row.name, row.source), []
+                points.append((value, row.mentions))
+            for point in self._smoothed_points(series_key, points, seconds, smoothing, window):
+                yield point
+
     @staticmethod
-    async def _get_or_create_article(
-        session: AsyncSession, record: dict
-    ) -> Article:
-        result = await session.execute(
-            select(Article).where(Article.content_hash == record["content_hash"])
+    def _smoothed_points(
+        series_key: tuple[str, str] | None,
+        points: list[tuple[datetime, int]],
+        seconds: int,
+        method: str | None,
+        window: int,
+    ) -> list[dict]:
+        if series_key is None or not points or method is None:
+            return []
+        frame = _smooth(points, seconds, method, window)
+        name, source = series_key
+        return [
+            {
+                "entity": name,
+                "source": source,
+                "bucket": bucket.to_pydatetime(),
+                "mentions": int(mentions),
+                "smoothed": float(smoothed),
+            }
+            for bucket, mentions, smoothed in zip(frame.index, frame["mentions"], frame["smoothed"])
+        ]
+
+    async def iter_mention_export(
+        self,
+        since: datetime,
+        entity: str | None = None,
+        source: str | None = None,
+        batch_size: int = 10_000,
+    ) -> AsyncIterator[Sequence]:
+        query = (
+            select(
+                Mention.id.label("mention_id"),
+                PoliticalEntity.name.label("entity"),
+                Article.source,
+                Article.published_at,
+                Article.url.label("article_url"),
+                Article.title,
+                Mention.count,
+                Mention.offsets,
+            )
+            .join(Mention.entity)
+            .join(Mention.article)
+            .where(Article.published_at >= since)
         )
-        article = result.scalar_one_or_none()
+        if entity is not None:
+            query = query.where(PoliticalEntity.name == entity)
+        if source is not None:
+            query = query.where(Article.source == source)
+        # Ordering by entity first keeps every (date, entity) partition contiguous in the stream.
+        query = query.order_by(PoliticalEntity.name, Article.published_at, Mention.id)
 
-        if not article:
-            article = Article(
-                title=record["title"],
-                url=record["article_url"],
-                content=record.get("content", ""),
-                published_at=record["date"],
-                source=record["source"],
-                content_hash=record["content_hash"],
+        async with self.postgres(f"{self.__class__.__name__}.iter_mention_export", read_only=True) as session:
+            result = await session.stream(query.execution_options(yield_per=batch_size))
+            async for rows in result.partitions(batch_size):
+                yield rows
+
+    async def get_latest_mentions(self, limit: int = 50, snippets: int = 1) -> list[dict]:
+        async with self.postgres(f"{self.__class__.__name__}.get_latest_mentions", read_only=True) as session:
+            result = await session.execute(
+                select(
+                    Mention.id,
+                    PoliticalEntity.name,
+                    Article.source,
+                    Article.title,
+                    Article.url,
+                    Article.published_at,
+                    Mention.count,
+                    Mention.offsets,
+                    Article.content,
+                )
+                .join(Mention.entity)
+                .join(Mention.article)
+                .order_by(Article.published_at.desc(), Mention.id.desc())
+                .limit(limit)
             )
-            session.add(article)
-            await session.flush()
+            return [
+                {
+                    "id": row.id,
+                    "entity": row.name,
+                    "source": row.source,
+                    "title": row.title,
+                    "url": row.url,
+                    "published_at": row.published_at,
+                    "count": row.count,
+                    "snippets": make_snippets(row.title, row.content, row.offsets, limit=snippets),
+                }
+                for row in result.all()
+            ]
 
-        return article
+    async def get_mention_snippets(self, mention_id: int) -> dict | None:
+        async with self.postgres(f"{self.__class__.__name__}.get_mention_snippets", read_only=True) as session:
+            result = await session.execute(
+                select(
+                    PoliticalEntity.name,
+                    Article.title,
+                    Article.url,
+                    Article.content,
+                    Mention.count,
+                    Mention.offsets,
+                )
+                .join(Mention.entity)
+                .join(Mention.article)
+                .where(Mention.id == mention_id)
+            )
+            row = result.one_or_none()
+            if row is None:
+                return None
+            return {
+                "id": mention_id,
+                "entity": row.name,
+                "title": row.title,
+                "url": row.url,
+                "count": row.count,
+                "snippets": make_snippets(row.title, row.content, row.offsets),
+            }
 
     @staticmethod
-    async def _get_or_create_entity(
-        session: AsyncSession, entity_name: str
-    ) -> PoliticalEntity:
-        result = await session.execute(
-            select(PoliticalEntity).where(PoliticalEntity.name == entity_name)
+    def _canonical_article(since: datetime):
+        # The cluster's first article is only stored when it had mentions itself; otherwise the
+        # lowest stored member stands for the story so that it is still counted once.
+        representatives = (
+            select(
+                func.coalesce(
+                    func.min(Article.id).filter(Article.content_hash == Article.cluster_id),
+                    func.min(Article.id),
+                )
+            )
+            .where(Article.cluster_id.is_not(None), Article.published_at >= since)
+            .group_by(Article.cluster_id)
         )
-        entity = result.scalar_one_or_none()
+        return or_(Article.cluster_id.is_(None), Article.id.in_(representatives))
 
-        if not entity:
-            entity = PoliticalEntity(name=entity_name)
-            session.add(entity)
-            await session.flush()
+    @staticmethod
+    async def _notify_results(session: AsyncSession) -> None:
+        if session.get_bind().dialect.name != "postgresql":
+            return
+        await session.execute(text("SELECT pg_notify(:channel, '')"), {"channel": RESULTS_CHANNEL})
 
-        return entity
+    # Upserts rather than select-then-insert: with sharded workers another process may be
+    # saving the same article, entity or mention at the same time.
+    async def _get_or_create_article(
+        self, session: AsyncSession, record: dict
+    ) -> tuple[int, datetime]:
+        article = self.articles.get(record["content_hash"])
+        if article is not None:
+            return article
 
-    @staticmethod
-    async def _create_or_update_mention(
+        articles = await self._upsert_articles(session, [record])
+        article = articles[record["content_hash"]]
+        self.articles.set(record["content_hash"], article)
+        return article
+
+    async def _get_or_create_entity(
+        self, session: AsyncSession, entity_name: str
+    ) -> int:
+        entity_id = self.entity_ids.get(entity_name)
+        if entity_id is not None:
+            return entity_id
+
+        entity_ids = await self._upsert_entities(session, [{"entity": entity_name}])
+        entity_id = entity_ids[entity_name]
+        self.entity_ids.set(entity_name, entity_id)
+        return entity_id
+
+    async def _create_mention(
+        self,
         session: AsyncSession,
-        article: Article,
-        entity: PoliticalEntity,
+        article: tuple[int, datetime],
+        entity_id: int,
         record: dict,
-    ) -> None:
+    ) -> bool:
+        inserted = await self._insert_mentions(
+            session, [record], {record["content_hash"]: article}, {record["entity"]: entity_id}
+        )
+        return bool(inserted)
+
+    @staticmethod
+    async def _upsert_articles(
+        session: AsyncSession, records: list[dict]
+    ) -> dict[str, tuple[int, datetime]]:
+        if not records:
+            return {}
+        values: dict[str, dict] = {}
+        for record in records:
+            values.setdefault(
+                record["content_hash"],
+                {
+                    "title": record["title"],
+                    "url": record["article_url"],
+                    "content": record.get("content", ""),
+                    "published_at": record["date"],
+                    "source": record["source"],
+                    "content_hash": record["content_hash"],
+                    "simhash": record.get("simhash"),
+                    "cluster_id": record.get("cluster_id"),
+                },
+            )
+
+        # Both content_hash and url are unique, and the same url may arrive with a different text
+        # (RSS vs NewsAPI), so any conflict is skipped and the stored row is looked up instead.
+        stmt = _insert(session, Article).values(list(values.values()))
+        stmt = stmt.on_conflict_do_nothing().returning(Article.id, Article.content_hash, Article.published_at)
+        result = await session.execute(stmt)
+        articles = {row.content_hash: (row.id, row.published_at) for row in result.all()}
+
+        missing = [value for content_hash, value in values.items() if content_hash not in articles]
+        if not missing:
+            return articles
         result = await session.execute(
-            select(Mention).where(
-                and_(Mention.article_id == article.id, Mention.entity_id == entity.id)
+            select(Article.id, Article.content_hash, Article.url, Article.published_at).where(
+                or_(
+                    Article.content_hash.in_([value["content_hash"] for value in missing]),
+                    Article.url.in_([value["url"] for value in missing]),
+                )
             )
         )
-        mention = result.scalar_one_or_none()
+        by_hash: dict[str, tuple[int, datetime]] = {}
+        by_url: dict[str, tuple[int, datetime]] = {}
+        for row in result.all():
+            by_hash[row.content_hash] = (row.id, row.published_at)
+            by_url.setdefault(row.url, (row.id, row.published_at))
+        for value in missing:
+            article = by_hash.get(value["content_hash"], by_url.get(value["url"]))
+            if article is not None:
+                articles[value["content_hash"]] = article
+        return articles
 
-        if mention:
-            mention.count += record["count"]
-        else:
-            mention = Mention(
-                article_id=article.id,
-                entity_id=entity.id,
-                count=record["count"],
-            )
-            session.add(mention)
+    @staticmethod
+    async def _upsert_entities(
+        session: AsyncSession, records: list[dict]
+    ) -> dict[str, int]:
+        if not records:
+            return {}
+        names = list(dict.fromkeys(record["entity"] for record in records))
+
+        stmt = _insert(session, PoliticalEntity).values([{"name": name} for name in names])
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[PoliticalEntity.name],
+            set_={"name": stmt.excluded.name},
+        ).returning(PoliticalEntity.id, PoliticalEntity.name)
+        result = await session.execute(stmt)
+        return {row.name: row.id for row in result.all()}
+
+    @staticmethod
+    async def _insert_mentions(
+        session: AsyncSession,
+        records: list[dict],
+        articles: dict[str, tuple[int, datetime]],
+        entity_ids: dict[str, int],
+    ) -> set[tuple[int, int]]:
+        counts: dict[tuple[int, int], int] = {}
+        offsets: dict[tuple[int, int], bytes | None] = {}
+        published_at: dict[int, datetime] = {}
+        for record in records:
+            article_id, published_at[article_id] = articles[record["content_hash"]]
+            key = (article_id, entity_ids[record["entity"]])
+            counts[key] = counts.get(key, 0) + record["count"]
+            offsets[key] = record.get("offsets")
+
+        stmt = _insert(session, Mention).values(
+            [
+                {
+                    "article_id": article_id,
+                    "entity_id": entity_id,
+                    "published_at": published_at[article_id],
+                    "count": count,
+                    "offsets": offsets[(article_id, entity_id)],
+                }
+                for (article_id, entity_id), count in counts.items()
+            ]
+        )
+        # An article that is already counted, e.g. one fetched by two workers through overlapping
+        # queries, keeps its mentions: only the newly inserted ones are returned for the rollups.
+        stmt = stmt.on_conflict_do_nothing(
+            index_elements=[Mention.article_id, Mention.entity_id, Mention.published_at]
+        ).returning(Mention.article_id, Mention.entity_id)
+        result = await session.execute(stmt)
+        return {(row.article_id, row.entity_id) for row in result.all()}
+
+    @staticmethod
+    async def _upsert_rollups(
+        session: AsyncSession,
+        rows: list[tuple[int, str, date, int]],
+    ) -> None:
+        if not rows:
+            return
+
+        totals: dict[tuple[int, str, str, datetime], int] = {}
+        for entity_id, source, published_at, count in rows:
+            for granularity in ROLLUP_GRANULARITIES:
+                key = (entity_id, source, granularity, _rollup_bucket(published_at, granularity))
+                totals[key] = totals.get(key, 0) + count
+
+        stmt = _insert(session, MentionRollup).values(
+            [
+                {
+                    "entity_id": entity_id,
+                    "source": source,
+                    "granularity": granularity,
+                    "bucket": bucket,
+                    "mentions": mentions,
+                }
+                for (entity_id, source, granularity, bucket), mentions in totals.items()
+            ]
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[
+                MentionRollup.entity_id,
+                MentionRollup.source,
+                MentionRollup.granularity,
+                MentionRollup.bucket,
+            ],
+            set_={"mentions": MentionRollup.mentions + stmt.excluded.mentions},
+        )
+        await session.execute(stmt)
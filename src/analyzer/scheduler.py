@@ -0,0 +1,148 @@
+import asyncio
+import logging
+import time
+from typing import Callable
+
+from src.analyzer.jobs import FetchJobQueue, JobLease
+from src.analyzer.polit_analyzator import SOURCES, MentionAnalyzer
+
+logger = logging.getLogger(__name__)
+
+
+class AnalyzerScheduler:
+    def __init__(
+        self,
+        analyzer: MentionAnalyzer,
+        intervals: dict[str, float],
+        days: int = 1,
+        shutdown_timeout: float = 60,
+    ):
+        unknown = set(intervals) - set(SOURCES)
+        if unknown:
+            raise ValueError(f"Unknown sources in scheduler intervals: {', '.join(sorted(unknown))}")
+        self.analyzer = analyzer
+        self.intervals = intervals
+        self.days = days
+        self.shutdown_timeout = shutdown_timeout
+        self.stopping = asyncio.Event()
+        self.next_run: dict[str, float] = {}
+
+    def stop(self) -> None:
+        if not self.stopping.is_set():
+            logger.info("Scheduler stop requested, waiting for the current run to finish")
+            self.stopping.set()
+
+    async def run(self, after_run: Callable[[], None] | None = None) -> None:
+        now = time.monotonic()
+        self.next_run = {source: now for source in self.intervals}
+        logger.info(f"Scheduler started with intervals: {self.intervals}")
+
+        while not self.stopping.is_set():
+            now = time.monotonic()
+            due = [source for source, at in self.next_run.items() if at <= now]
+            if not due:
+                await self._sleep(min(self.next_run.values()) - now)
+                continue
+
+            started = time.monotonic()
+            task = asyncio.create_task(self._run_once(due))
+            await self._wait_for(task)
+            for source in due:
+                self.next_run[source] = started + self.intervals[source]
+            if after_run is not None:
+                after_run()
+
+        logger.info("Scheduler stopped")
+
+    async def _run_once(self, sources: list[str]) -> None:
+        logger.info(f"Scheduled run for sources: {', '.join(sources)}")
+        try:
+            await self.analyzer.analyze(days=self.days, sources=sources)
+        except Exception as e:
+            logger.error(f"Scheduled run for {', '.join(sources)} failed: {str(e)}")
+
+    async def _wait_for(self, task: asyncio.Task) -> None:
+        stop_task = asyncio.create_task(self.stopping.wait())
+        try:
+            await asyncio.wait([task, stop_task], return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            stop_task.cancel()
+        if task.done():
+            return
+
+        done, _ = await asyncio.wait([task], timeout=self.shutdown_timeout)
+        if not done:
+            logger.warning(f"Run did not finish within {self.shutdown_timeout}s, cancelling")
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+
+    async def _sleep(self, delay: float) -> None:
+        try:
+            await asyncio.wait_for(self.stopping.wait(), timeout=max(delay, 0))
+        except asyncio.TimeoutError:
+            pass
+
+
+class JobWorker(AnalyzerScheduler):
+    def __init__(
+        self,
+        analyzer: MentionAnalyzer,
+        queue: FetchJobQueue,
+        intervals: dict[str, float],
+        days: int = 1,
+        shutdown_timeout: float = 60,
+        claim_size: int = 10,
+        poll_interval: float = 30,
+    ):
+        super().__init__(analyzer, intervals, days, shutdown_timeout)
+        self.queue = queue
+        self.claim_size = claim_size
+        self.poll_interval = poll_interval
+
+    async def run(self, after_run: Callable[[], None] | None = None) -> None:
+        await self.analyzer.load_dictionary()
+        units = self.analyzer.fetch_units(self.intervals)
+        await self.queue.sync({unit: self.intervals[unit[0]] for unit in units})
+        logger.info(f"Job worker {self.queue.worker_id} started")
+
+        while not self.stopping.is_set():
+            jobs = await self.queue.claim(self.claim_size)
+            if not jobs:
+                await self._sleep(self.poll_interval)
+                continue
+
+            task = asyncio.create_task(self._run_jobs(jobs))
+            await self._wait_for(task)
+            if after_run is not None:
+                after_run()
+
+        logger.info(f"Job worker {self.queue.worker_id} stopped")
+
+    async def _run_jobs(self, jobs: list[JobLease]) -> None:
+        logger.info(f"Running fetch jobs: {', '.join(f'{job.kind}:{job.key}' for job in jobs)}")
+        heartbeat = asyncio.create_task(self._heartbeat(jobs))
+        try:
+            await self.analyzer.analyze(days=self.days, units=[(job.kind, job.key) for job in jobs])
+        except asyncio.CancelledError:
+            await self.queue.release(jobs)
+            raise
+        except Exception as e:
+            logger.error(f"Fetch jobs failed: {str(e)}")
+            await self.queue.release(jobs, error=str(e))
+        else:
+            # Fetchers skip a failing query or feed and carry on, so only those units go back for a retry.
+            failures = self.analyzer.fetch_failures
+            failed = [job for job in jobs if (job.kind, job.key) in failures]
+            for job in failed:
+                await self.queue.release([job], error=failures[(job.kind, job.key)])
+            await self.queue.complete([job for job in jobs if (job.kind, job.key) not in failures])
+        finally:
+            heartbeat.cancel()
+
+    async def _heartbeat(self, jobs: list[JobLease]) -> None:
+        while True:
+            await asyncio.sleep(self.queue.lease_timeout / 3)
+            try:
+                await self.queue.extend(jobs)
+            except Exception as e:
+                logger.warning(f"Failed to extend fetch job leases: {str(e)}")
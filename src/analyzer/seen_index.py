@@ -0,0 +1,77 @@
+from datetime import datetime, timedelta, timezone
+from hashlib import blake2b
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+_TRACKING_PREFIXES = ("utm_",)
+_TRACKING_PARAMS = {"yclid", "gclid", "fbclid", "from", "rss"}
+
+
+def canonicalize_url(url: str) -> str:
+    if not url:
+        return ""
+    parts = urlsplit(url.strip())
+    query = urlencode(
+        sorted(
+            (key, value)
+            for key, value in parse_qsl(parts.query, keep_blank_values=True)
+            if key.lower() not in _TRACKING_PARAMS and not key.lower().startswith(_TRACKING_PREFIXES)
+        )
+    )
+    netloc = parts.netloc.lower()
+    if netloc.startswith("www."):
+        netloc = netloc[4:]
+    path = parts.path.rstrip("/") or "/"
+    return urlunsplit(("https", netloc, path, query, ""))
+
+
+def _fingerprint(value: str) -> int:
+    return int.from_bytes(blake2b(value.encode("utf-8"), digest_size=8).digest(), "big")
+
+
+def _as_utc(value: datetime) -> datetime:
+    if value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+class SeenIndex:
+    def __init__(self):
+        self.urls: set[int] = set()
+        self.hashes: set[int] = set()
+        # Newest article per fetch unit, e.g. ("newsapi", query); only a lower bound for the next fetch.
+        self.high_water: dict[tuple[str, str], datetime] = {}
+        self.loaded = False
+
+    def __len__(self) -> int:
+        return len(self.hashes)
+
+    def has_url(self, url: str) -> bool:
+        return bool(url) and _fingerprint(url) in self.urls
+
+    def has_hash(self, content_hash: str) -> bool:
+        return _fingerprint(content_hash) in self.hashes
+
+    def fetch_since(self, unit: tuple[str, str], overlap: timedelta) -> datetime | None:
+        mark = self.high_water.get(unit)
+        return mark - overlap if mark is not None else None
+
+    def add_url(self, url: str) -> None:
+        if url:
+            self.urls.add(_fingerprint(url))
+
+    def add(self, url: str, content_hash: str) -> None:
+        self.add_url(url)
+        self.hashes.add(_fingerprint(content_hash))
+
+    def advance(self, unit: tuple[str, str], published_at) -> None:
+        if not isinstance(published_at, datetime):
+            return
+        published_at = _as_utc(published_at)
+        if published_at > self.high_water.get(unit, datetime.min):
+            self.high_water[unit] = published_at
+
+    def merge(self, other: "SeenIndex") -> None:
+        self.urls |= other.urls
+        self.hashes |= other.hashes
+        for unit, published_at in other.high_water.items():
+            self.advance(unit, published_at)
@@ -0,0 +1,49 @@
+import sys
+from array import array
+
+SNIPPET_WINDOW = 50
+
+
+def pack_spans(spans: list[tuple[int, int]]) -> bytes:
+    packed = array("I", [value for span in spans for value in span])
+    if sys.byteorder != "little":
+        packed.byteswap()
+    return packed.tobytes()
+
+
+def unpack_spans(data: bytes | None) -> list[tuple[int, int]]:
+    if not data:
+        return []
+    values = array("I")
+    values.frombytes(data)
+    if sys.byteorder != "little":
+        values.byteswap()
+    return list(zip(values[::2], values[1::2]))
+
+
+def article_text(title: str, content: str) -> str:
+    return f"{title} {content}"
+
+
+def make_snippet(text: str, start: int, end: int, window: int = SNIPPET_WINDOW) -> str:
+    before = text[max(0, start - window):start]
+    after = text[end:end + window]
+    return f"{before}[{text[start:end]}]{after}".strip()
+
+
+def make_snippets(
+    title: str,
+    content: str,
+    offsets: bytes | None,
+    limit: int | None = None,
+    window: int = SNIPPET_WINDOW,
+) -> list[str]:
+    text = article_text(title or "", content or "")
+    lowered = text.lower()
+    # Offsets point into the lowercased text; fall back to it if lowercasing changed the length.
+    if len(lowered) != len(text):
+        text = lowered
+    spans = unpack_spans(offsets)
+    if limit is not None:
+        spans = spans[:limit]
+    return [make_snippet(text, start, end, window) for start, end in spans if end <= len(text)]
@@ -1,23 +1,175 @@
+from typing import Awaitable, cast
+
 from dependency_injector.containers import DeclarativeContainer, WiringConfiguration
 from dependency_injector.providers import Singleton, Resource
 
+from src.analyzer.backfill import EntityBackfill
+from src.analyzer.export import MentionExporter
+from src.analyzer.partitions import ArticlePartitionManager
 from src.analyzer.polit_analyzator import MentionAnalyzer
+from src.analyzer.repository import AnalyzerRepository, RESULTS_CHANNEL
+from src.analyzer.jobs import FetchJobQueue
+from src.analyzer.scheduler import AnalyzerScheduler, JobWorker
 from src.services.news_api import NewsAPIWorker
 from src.services.rss_parser import RSSParser
 from src.settings import settings
+from src.core.cache import StatsCache
+from src.core.http_client import HttpClient
+from src.core.payload_store import PayloadStore
+from src.core.rate_limit import DailyQuota
 from src.core.logger import get_logger
 from src.core.postgres import Postgres
 
 
+class SharedResource(Resource):
+    # Resources every entrypoint needs. The API server initialises only these, so it does not
+    # compile the dictionary, start the worker pools or open the payload store of the analyzer.
+    pass
+
+
 class ApplicationContainer(DeclarativeContainer):
     wiring_config: WiringConfiguration = WiringConfiguration(
         modules=[
+            "src.router",
         ]
     )
 
     logger = Singleton(get_logger)
-    postgres = Resource(Postgres.resource(), uri=settings.postgres.uri)
+    postgres = SharedResource(
+        Postgres.resource(),
+        uri=settings.postgres.uri,
+        pool_size=settings.postgres.pool_size,
+        read_uri=settings.postgres.read_uri,
+        read_pool_size=settings.postgres.read_pool_size,
+    )
+    http_client = SharedResource(
+        HttpClient.resource(),
+        pool_size=settings.http.pool_size,
+        pool_size_per_host=settings.http.pool_size_per_host,
+        keepalive_timeout=settings.http.keepalive_timeout,
+        request_timeout=settings.http.request_timeout,
+    )
+    payload_store = Resource(
+        PayloadStore.resource(),
+        path=settings.payload_store.path,
+        mode=settings.payload_store.mode,
+        segment_size=settings.payload_store.segment_size,
+        compression_level=settings.payload_store.compression_level,
+    )
+
+    repository = Singleton(
+        AnalyzerRepository,
+        postgres=postgres,
+        bulk_save=settings.analyzer.bulk_save,
+        chunk_size=settings.analyzer.save_chunk_size,
+        article_cache_size=settings.analyzer.article_cache_size,
+    )
+    partitions = Singleton(ArticlePartitionManager, postgres=postgres)
+    stats_cache = Singleton(
+        StatsCache,
+        postgres=postgres,
+        channel=RESULTS_CHANNEL,
+        maxsize=settings.stats_cache.maxsize,
+        ttl=settings.stats_cache.ttl,
+    )
+    news_quota = Singleton(
+        DailyQuota,
+        postgres=postgres,
+        provider="newsapi",
+        limit=settings.news.quota_daily_requests,
+    )
+    news_api = Singleton(
+        NewsAPIWorker,
+        http_client=http_client,
+        api_key=settings.news.api_key,
+        base_url=settings.news.base_url,
+        request_timeout=settings.news.request_timeout,
+        page_size=settings.news.page_size,
+        max_pages=settings.news.max_pages,
+        quota_requests=settings.news.quota_requests,
+        quota_period=settings.news.quota_period,
+        quota_burst=settings.news.quota_burst,
+        quota_max_wait=settings.news.quota_max_wait,
+        max_retries=settings.news.max_retries,
+        retry_backoff=settings.news.retry_backoff,
+        combine_queries=settings.news.combine_queries,
+        query_max_length=settings.news.query_max_length,
+        payload_store=payload_store,
+        daily_quota=news_quota,
+    )
+    rss_parser = Resource(
+        RSSParser.resource(),
+        http_client=http_client,
+        feed_urls=settings.rss_parser.rss_urls,
+        state_path=settings.rss_parser.state_path,
+        parse_workers=settings.rss_parser.parse_workers,
+        request_timeout=settings.rss_parser.request_timeout,
+        payload_store=payload_store,
+    )
+    analyzer = Resource(
+        MentionAnalyzer.resource(),
+        repository=repository,
+        rss_parser=rss_parser,
+        news_api=news_api,
+        entities=settings.analyzer.entities,
+        entity_dictionary=settings.analyzer.entity_dictionary,
+        inflect_entities=settings.analyzer.inflect_entities,
+        dictionary_cache_dir=settings.analyzer.dictionary_cache_dir,
+        news_concurrency=settings.news.concurrency,
+        incremental=settings.analyzer.incremental,
+        fetch_overlap_hours=settings.analyzer.fetch_overlap_hours,
+        queue_size=settings.analyzer.queue_size,
+        batch_size=settings.analyzer.save_chunk_size,
+        workers=settings.analyzer.workers,
+        worker_batch_size=settings.analyzer.worker_batch_size,
+        near_dup_enabled=settings.analyzer.near_dup_enabled,
+        near_dup_max_distance=settings.analyzer.near_dup_max_distance,
+        near_dup_capacity=settings.analyzer.near_dup_capacity,
+        near_dup_window_hours=settings.analyzer.near_dup_window_hours,
+        drop_near_duplicates=settings.analyzer.drop_near_duplicates,
+    )
+    scheduler = Singleton(
+        AnalyzerScheduler,
+        analyzer=analyzer,
+        intervals=settings.scheduler.intervals,
+        days=settings.scheduler.days,
+        shutdown_timeout=settings.scheduler.shutdown_timeout,
+    )
+    job_queue = Singleton(
+        FetchJobQueue,
+        postgres=postgres,
+        worker_id=settings.scheduler.worker_id,
+        lease_timeout=settings.scheduler.lease_timeout,
+        retry_delay=settings.scheduler.retry_delay,
+    )
+    job_worker = Singleton(
+        JobWorker,
+        analyzer=analyzer,
+        queue=job_queue,
+        intervals=settings.scheduler.intervals,
+        days=settings.scheduler.days,
+        shutdown_timeout=settings.scheduler.shutdown_timeout,
+        claim_size=settings.scheduler.claim_size,
+        poll_interval=settings.scheduler.poll_interval,
+    )
+    backfill = Singleton(
+        EntityBackfill,
+        analyzer=analyzer,
+        repository=repository,
+        batch_size=settings.analyzer.save_chunk_size,
+    )
+    exporter = Singleton(
+        MentionExporter,
+        repository=repository,
+        batch_size=settings.export.batch_size,
+        compression=settings.export.compression,
+    )
+
+
+# All resources are async, so the container always returns an awaitable here.
+async def init_resources(container: ApplicationContainer, resource_type: type[Resource] = Resource) -> None:
+    await cast(Awaitable[None], container.init_resources(resource_type))
+
 
-    news_api = Singleton(NewsAPIWorker, api_key=settings.news.api_key, base_url=settings.news.base_url)
-    rss_parser = Singleton(RSSParser, feed_urls=settings.rss_parser.rss_urls)
-    analyzer = Singleton(MentionAnalyzer, rss_parser=rss_parser, news_api=news_api, entities=settings.analyzer.entities)
+async def shutdown_resources(container: ApplicationContainer, resource_type: type[Resource] = Resource) -> None:
+    await cast(Awaitable[None], container.shutdown_resources(resource_type))
@@ -0,0 +1,100 @@
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Hashable
+
+from src.core.metrics import cache_lookups
+from src.core.postgres import Postgres
+
+logger = logging.getLogger(__name__)
+
+
+class TTLCache:
+    def __init__(self, maxsize: int = 256, ttl: float = 30):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: Hashable) -> Any | None:
+        item = self._data.get(key)
+        if item is None:
+            return None
+        expires_at, value = item
+        if expires_at < time.monotonic():
+            del self._data[key]
+            return None
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        self._data[key] = (time.monotonic() + self.ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def clear(self, *_: Any) -> None:
+        self._data.clear()
+
+
+class LRUCache:
+    def __init__(self, name: str, maxsize: int = 10_000):
+        self.name = name
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data: OrderedDict[Hashable, Any] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: Hashable) -> Any | None:
+        value = self._data.get(key)
+        if value is None:
+            self.misses += 1
+            cache_lookups.labels(cache=self.name, result="miss").inc()
+            return None
+        self.hits += 1
+        cache_lookups.labels(cache=self.name, result="hit").inc()
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        self._data[key] = value
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        self._data.clear()
+
+
+class StatsCache:
+    def __init__(self, postgres: Postgres, channel: str, maxsize: int = 256, ttl: float = 30):
+        self.postgres = postgres
+        self.channel = channel
+        self.cache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._listening = False
+        self._lock = asyncio.Lock()
+
+    async def get_or_load(self, key: Hashable, loader: Callable[[], Awaitable[Any]]) -> Any:
+        await self._ensure_listening()
+        value = self.cache.get(key)
+        if value is None:
+            value = await loader()
+            self.cache.set(key, value)
+        return value
+
+    async def _ensure_listening(self) -> None:
+        if self._listening:
+            return
+        async with self._lock:
+            if not self._listening:
+                try:
+                    await self.postgres.listen(self.channel, self.cache.clear)
+                except Exception as e:
+                    logger.warning(f"Failed to listen on {self.channel}, relying on TTL only: {str(e)}")
+                self._listening = True
@@ -0,0 +1,33 @@
+import aiohttp
+
+from src.core.resource import AppResource
+
+
+class HttpClient(AppResource):
+    session: aiohttp.ClientSession
+
+    def __init__(
+        self,
+        pool_size: int = 100,
+        pool_size_per_host: int = 10,
+        keepalive_timeout: float = 30,
+        request_timeout: float = 30,
+    ):
+        self.pool_size = pool_size
+        self.pool_size_per_host = pool_size_per_host
+        self.keepalive_timeout = keepalive_timeout
+        self.request_timeout = request_timeout
+
+    async def connect(self) -> None:
+        connector = aiohttp.TCPConnector(
+            limit=self.pool_size,
+            limit_per_host=self.pool_size_per_host,
+            keepalive_timeout=self.keepalive_timeout,
+        )
+        self.session = aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=self.request_timeout),
+        )
+
+    async def disconnect(self) -> None:
+        await self.session.close()
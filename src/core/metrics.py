@@ -0,0 +1,27 @@
+import logging
+
+from prometheus_client import REGISTRY, Counter, Histogram, push_to_gateway, write_to_textfile
+
+logger = logging.getLogger(__name__)
+
+fetch_timings = Histogram("analyzer_fetch_timings", "", ("fetcher", "source"))
+fetch_errors = Counter("analyzer_fetch_errors", "", ("fetcher", "source"))
+articles_total = Counter("analyzer_articles", "", ("stage",))
+match_timings = Histogram("analyzer_match_timings", "", ("mode",))
+rows_written = Counter("analyzer_rows_written", "", ("table",))
+commit_timings = Histogram("analyzer_batch_commit_timings", "", ("metric",))
+cache_lookups = Counter("analyzer_cache_lookups", "", ("cache", "result"))
+fetch_jobs = Counter("analyzer_fetch_jobs", "", ("result",))
+
+
+def export_metrics(job: str, pushgateway_url: str | None = None, textfile_path: str | None = None) -> None:
+    if pushgateway_url:
+        try:
+            push_to_gateway(pushgateway_url, job=job, registry=REGISTRY)
+        except Exception as e:
+            logger.warning(f"Failed to push metrics to {pushgateway_url}: {str(e)}")
+    if textfile_path:
+        try:
+            write_to_textfile(textfile_path, REGISTRY)
+        except Exception as e:
+            logger.warning(f"Failed to write metrics to {textfile_path}: {str(e)}")
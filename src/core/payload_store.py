@@ -0,0 +1,136 @@
+import asyncio
+import json
+import logging
+import mmap
+import os
+import threading
+import time
+import zlib
+from typing import BinaryIO, Iterable, Iterator, NamedTuple, TextIO
+
+from src.core.resource import AppResource
+
+logger = logging.getLogger(__name__)
+
+MODES = ("live", "record", "replay")
+INDEX_FILE = "index.jsonl"
+
+
+class PayloadRecord(NamedTuple):
+    kind: str
+    key: str
+    segment: str
+    offset: int
+    length: int
+    recorded_at: float
+
+
+def _segment_name(number: int) -> str:
+    return f"segment-{number:06d}.zlib"
+
+
+class PayloadStore(AppResource):
+    def __init__(
+        self,
+        path: str | None,
+        mode: str = "live",
+        segment_size: int = 64 * 1024 * 1024,
+        compression_level: int = 6,
+    ):
+        if mode not in MODES:
+            raise ValueError(f"Unknown payload store mode: {mode}")
+        if mode != "live" and not path:
+            raise ValueError(f"Payload store path is required in {mode} mode")
+        # Only the live mode may run without a path, and it never touches the files.
+        self.path: str = path or ""
+        self.mode = mode
+        self.segment_size = segment_size
+        self.compression_level = compression_level
+        self.segment_number = 0
+        self.segment_file: BinaryIO | None = None
+        self.index_file: TextIO | None = None
+        self._lock = threading.Lock()
+
+    @property
+    def recording(self) -> bool:
+        return self.mode == "record"
+
+    @property
+    def replaying(self) -> bool:
+        return self.mode == "replay"
+
+    async def connect(self) -> None:
+        if not self.recording:
+            return
+        os.makedirs(self.path, exist_ok=True)
+        segments = sorted(name for name in os.listdir(self.path) if name.startswith("segment-"))
+        self.segment_number = len(segments)
+        self._open_segment()
+        self.index_file = open(os.path.join(self.path, INDEX_FILE), "a")
+        logger.info(f"Recording fetcher payloads to {self.path}")
+
+    async def disconnect(self) -> None:
+        with self._lock:
+            for file in (self.segment_file, self.index_file):
+                if file is not None:
+                    file.close()
+            self.segment_file = self.index_file = None
+
+    def _open_segment(self) -> None:
+        if self.segment_file is not None:
+            self.segment_file.close()
+        self.segment_number += 1
+        self.segment_file = open(os.path.join(self.path, _segment_name(self.segment_number)), "ab")
+
+    async def append(self, kind: str, key: str, payload: bytes) -> None:
+        if not self.recording or self.segment_file is None:
+            return
+        # Compression and file writes would otherwise stall the event loop on every large response.
+        await asyncio.to_thread(self._append, kind, key, payload, time.time())
+
+    def _append(self, kind: str, key: str, payload: bytes, recorded_at: float) -> None:
+        data = zlib.compress(payload, self.compression_level)
+        with self._lock:
+            if self.segment_file is None or self.index_file is None:
+                return
+            offset = self.segment_file.tell()
+            if offset and offset + len(data) > self.segment_size:
+                self._open_segment()
+                offset = 0
+            self.segment_file.write(data)
+            self.segment_file.flush()
+            record = PayloadRecord(kind, key, _segment_name(self.segment_number), offset, len(data), recorded_at)
+            self.index_file.write(json.dumps(record._asdict(), ensure_ascii=False) + "\n")
+            self.index_file.flush()
+
+    def records(self, kinds: Iterable[str] | None = None, since: float | None = None) -> list[PayloadRecord]:
+        kinds = set(kinds) if kinds is not None else None
+        records = []
+        with open(os.path.join(self.path, INDEX_FILE)) as f:
+            for line in f:
+                try:
+                    record = PayloadRecord(**json.loads(line))
+                except (ValueError, TypeError):
+                    logger.warning(f"Skipping malformed payload index line in {self.path}")
+                    continue
+                if (kinds is None or record.kind in kinds) and (since is None or record.recorded_at >= since):
+                    records.append(record)
+        return records
+
+    def iter_payloads(
+        self, kinds: Iterable[str] | None = None, since: float | None = None
+    ) -> Iterator[tuple[PayloadRecord, bytes]]:
+        # Records are appended segment by segment, so only one segment is mapped at a time.
+        name, segment = None, None
+        try:
+            for record in self.records(kinds, since):
+                if segment is None or record.segment != name:
+                    if segment is not None:
+                        segment.close()
+                    with open(os.path.join(self.path, record.segment), "rb") as f:
+                        segment = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                    name = record.segment
+                yield record, zlib.decompress(segment[record.offset:record.offset + record.length])
+        finally:
+            if segment is not None:
+                segment.close()
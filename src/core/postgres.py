@@ -1,10 +1,11 @@
 from contextlib import asynccontextmanager
-from typing import AsyncIterator
+from typing import AsyncIterator, Callable
 
 from prometheus_client import Histogram
 from sqlalchemy.ext.asyncio import (
     create_async_engine,
     async_sessionmaker,
+    AsyncConnection,
     AsyncEngine,
     AsyncSession,
 )
@@ -15,6 +16,8 @@ from src.core.resource import AppResource
 class Postgres(AppResource):
     engine: AsyncEngine
     session_maker: async_sessionmaker
+    read_engine: AsyncEngine | None = None
+    read_session_maker: async_sessionmaker | None = None
 
     def __init__(
         self,
@@ -22,35 +25,72 @@ class Postgres(AppResource):
         pool_size: int = 10,
         pool_timeout=30,
         pool_recycle=300,
+        read_uri: str | None = None,
+        read_pool_size: int = 10,
+        read_pool_timeout=30,
     ):
         self.query_histogram = Histogram("postgres_timings", "", ("metric",))
+        self.pool_wait_histogram = Histogram("postgres_pool_wait_timings", "", ("metric", "pool"))
         self.uri = uri
         self.pool_size = pool_size
         self.pool_timeout = pool_timeout
         self.pool_recycle = pool_recycle
+        self.read_uri = read_uri
+        self.read_pool_size = read_pool_size
+        self.read_pool_timeout = read_pool_timeout
+        self.listen_connection: AsyncConnection | None = None
 
     @asynccontextmanager
     async def __call__(
         self,
         metric: str = "postgres",
+        read_only: bool = False,
     ) -> AsyncIterator[AsyncSession]:
+        session_maker, pool = self.session_maker, "primary"
+        if read_only and self.read_session_maker is not None:
+            session_maker, pool = self.read_session_maker, "replica"
         with self.query_histogram.labels(metric=metric).time():
-            async with self.session_maker() as con:
+            async with session_maker() as con:
+                with self.pool_wait_histogram.labels(metric=metric, pool=pool).time():
+                    await con.connection()
                 yield con
 
-    async def connect(self) -> None:
-        self.engine: AsyncEngine = create_async_engine(
-            self.uri,
-            pool_size=self.pool_size,
-            pool_timeout=self.pool_timeout,
+    def _create_engine(self, uri: str, pool_size: int, pool_timeout) -> AsyncEngine:
+        return create_async_engine(
+            uri,
+            pool_size=pool_size,
+            pool_timeout=pool_timeout,
             pool_recycle=self.pool_recycle,
         )
-        self.session_maker = async_sessionmaker(
-            bind=self.engine,
+
+    @staticmethod
+    def _create_session_maker(engine: AsyncEngine) -> async_sessionmaker:
+        return async_sessionmaker(
+            bind=engine,
             autoflush=False,
             future=True,
             expire_on_commit=False,
         )
 
+    async def connect(self) -> None:
+        self.engine = self._create_engine(self.uri, self.pool_size, self.pool_timeout)
+        self.session_maker = self._create_session_maker(self.engine)
+        if self.read_uri:
+            self.read_engine = self._create_engine(self.read_uri, self.read_pool_size, self.read_pool_timeout)
+            self.read_session_maker = self._create_session_maker(self.read_engine)
+
+    async def listen(self, channel: str, callback: Callable[[str], None]) -> None:
+        if self.listen_connection is None:
+            self.listen_connection = await self.engine.connect()
+        raw_connection = await self.listen_connection.get_raw_connection()
+        driver_connection = raw_connection.driver_connection
+        if driver_connection is None:
+            raise RuntimeError("Listen connection is detached from its driver connection")
+        await driver_connection.add_listener(channel, lambda _con, _pid, _channel, payload: callback(payload))
+
     async def disconnect(self) -> None:
+        if self.listen_connection is not None:
+            await self.listen_connection.close()
         await self.engine.dispose()
+        if self.read_engine is not None:
+            await self.read_engine.dispose()
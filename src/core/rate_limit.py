@@ -0,0 +1,66 @@
+import asyncio
+import time
+from datetime import datetime, timezone
+
+from sqlalchemy.dialects import postgresql, sqlite
+
+from src.core.postgres import Postgres
+from src.models import ApiQuotaUsage
+
+
+class QuotaExceeded(Exception):
+    pass
+
+
+class TokenBucket:
+    def __init__(self, rate: float, capacity: float, max_wait: float | None = None):
+        self.rate = rate
+        self.capacity = capacity
+        self.max_wait = max_wait
+        self.tokens = capacity
+        self.updated_at = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    async def acquire(self, tokens: float = 1) -> None:
+        # Tokens are reserved up front (the balance may go negative) and the wait happens afterwards,
+        # so concurrent callers queue behind each other without serializing on the sleep.
+        self._refill()
+        wait = max(tokens - self.tokens, 0) / self.rate
+        if self.max_wait is not None and wait > self.max_wait:
+            raise QuotaExceeded(f"Rate limit quota exhausted, next token in {wait:.0f}s")
+        self.tokens -= tokens
+        if wait <= 0:
+            return
+        try:
+            await asyncio.sleep(wait)
+        except asyncio.CancelledError:
+            self.tokens += tokens
+            raise
+
+
+class DailyQuota:
+    # Usage is counted per UTC day in Postgres, so restarts, cron runs and parallel workers share one budget.
+    def __init__(self, postgres: Postgres, provider: str, limit: int):
+        self.postgres = postgres
+        self.provider = provider
+        self.limit = limit
+
+    async def acquire(self, requests: int = 1) -> int:
+        day = datetime.now(timezone.utc).date()
+        async with self.postgres(f"{self.__class__.__name__}.acquire") as session:
+            insert = sqlite.insert if session.get_bind().dialect.name == "sqlite" else postgresql.insert
+            usage = insert(ApiQuotaUsage).values(provider=self.provider, day=day, requests=requests)
+            stmt = usage.on_conflict_do_update(
+                index_elements=[ApiQuotaUsage.provider, ApiQuotaUsage.day],
+                set_={"requests": ApiQuotaUsage.requests + usage.excluded.requests},
+                where=ApiQuotaUsage.requests + usage.excluded.requests <= self.limit,
+            ).returning(ApiQuotaUsage.requests)
+            used = (await session.execute(stmt)).scalar()
+            await session.commit()
+        if used is None:
+            raise QuotaExceeded(f"Daily {self.provider} quota of {self.limit} requests exhausted for {day}")
+        return used
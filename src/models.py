@@ -1,14 +1,16 @@
 from sqlalchemy.orm import Mapped, mapped_column, relationship
-from sqlalchemy import Integer, String, Text, DateTime, ForeignKey, Index
+from sqlalchemy import BigInteger, Date, Float, Integer, LargeBinary, String, Text, DateTime, ForeignKey, Index, PrimaryKeyConstraint, text
 from sqlalchemy.dialects.postgresql import TIMESTAMP
-from datetime import datetime, timezone
+from datetime import date, datetime, timezone
 from src.core.models_base import Base
 
+ARTICLE_TEXT = "title || ' ' || coalesce(content, '')"
+
 
 class Article(Base):
     __tablename__ = "articles"
 
-    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, init=False)
     title: Mapped[str] = mapped_column(String(500), nullable=False)
     url: Mapped[str] = mapped_column(String(500), unique=True, nullable=False)
     content: Mapped[str | None] = mapped_column(Text)
@@ -17,34 +19,112 @@ class Article(Base):
     )
     source: Mapped[str] = mapped_column(String(100), nullable=False)
     content_hash: Mapped[str] = mapped_column(String(64), unique=True, nullable=False)
+    simhash: Mapped[int | None] = mapped_column(BigInteger, default=None)
+    cluster_id: Mapped[str | None] = mapped_column(String(64), default=None)
 
     mentions: Mapped[list["Mention"]] = relationship(
-        "Mention", back_populates="article", cascade="all, delete-orphan"
+        "Mention", back_populates="article", cascade="all, delete-orphan", default_factory=list
     )
 
     created_at: Mapped[datetime] = mapped_column(
         DateTime, default=datetime.now(timezone.utc), nullable=False
     )
 
+    __table_args__ = (
+        Index("ix_articles_published_at", "published_at"),
+        Index("ix_articles_source_published_at", "source", "published_at"),
+        Index(
+            "ix_articles_text_trgm",
+            text(f"lower({ARTICLE_TEXT}) gin_trgm_ops"),
+            postgresql_using="gin",
+        ).ddl_if(dialect="postgresql"),
+    )
+
 class PoliticalEntity(Base):
     __tablename__ = "political_entities"
 
-    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, init=False)
     name: Mapped[str] = mapped_column(String(100), unique=True, nullable=False)
-    type: Mapped[str | None] = mapped_column(String(50))
+    type: Mapped[str | None] = mapped_column(String(50), default=None)
+
+
+class EntityAlias(Base):
+    __tablename__ = "entity_aliases"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, init=False)
+    entity_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey("political_entities.id", ondelete="CASCADE"), nullable=False
+    )
+    alias: Mapped[str] = mapped_column(String(200), unique=True, nullable=False)
+    kind: Mapped[str] = mapped_column(String(20), nullable=False)
+
+    __table_args__ = (
+        Index("ix_entity_aliases_entity_id", "entity_id"),
+    )
 
 
 class Mention(Base):
     __tablename__ = "mentions"
 
-    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, init=False)
     article_id: Mapped[int] = mapped_column(Integer, ForeignKey("articles.id", ondelete="CASCADE"), nullable=False)
     entity_id: Mapped[int] = mapped_column(Integer, ForeignKey("political_entities.id"), nullable=False)
+    # Copied from the article so that mentions can be partitioned by the same month.
+    published_at: Mapped[datetime] = mapped_column(TIMESTAMP(timezone=True), nullable=False)
     count: Mapped[int] = mapped_column(Integer, default=1, nullable=False)
+    offsets: Mapped[bytes | None] = mapped_column(LargeBinary, nullable=True, default=None)
 
     article: Mapped["Article"] = relationship("Article", back_populates="mentions", default=None)
     entity: Mapped["PoliticalEntity"] = relationship("PoliticalEntity", default=None)
 
     __table_args__ = (
-        Index("ix_mentions_article_entity", "article_id", "entity_id", unique=True),
+        Index("ix_mentions_article_entity", "article_id", "entity_id", "published_at", unique=True),
+        Index("ix_mentions_entity_id", "entity_id"),
+    )
+
+
+class MentionRollup(Base):
+    __tablename__ = "mention_rollups"
+
+    entity_id: Mapped[int] = mapped_column(Integer, ForeignKey("political_entities.id"), nullable=False)
+    source: Mapped[str] = mapped_column(String(100), nullable=False)
+    granularity: Mapped[str] = mapped_column(String(8), nullable=False)
+    bucket: Mapped[datetime] = mapped_column(TIMESTAMP(timezone=True), nullable=False)
+    mentions: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+
+    __table_args__ = (
+        PrimaryKeyConstraint("entity_id", "source", "granularity", "bucket"),
+        Index("ix_mention_rollups_granularity_bucket", "granularity", "bucket"),
+    )
+
+
+class FetchJob(Base):
+    __tablename__ = "fetch_jobs"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, init=False)
+    kind: Mapped[str] = mapped_column(String(20), nullable=False)
+    key: Mapped[str] = mapped_column(String(1000), nullable=False)
+    interval: Mapped[float] = mapped_column(Float, nullable=False)
+    next_run_at: Mapped[datetime] = mapped_column(TIMESTAMP(timezone=True), nullable=False)
+    locked_by: Mapped[str | None] = mapped_column(String(200), default=None)
+    locked_until: Mapped[datetime | None] = mapped_column(TIMESTAMP(timezone=True), default=None)
+    attempts: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    last_error: Mapped[str | None] = mapped_column(Text, default=None)
+    finished_at: Mapped[datetime | None] = mapped_column(TIMESTAMP(timezone=True), default=None)
+
+    __table_args__ = (
+        Index("ix_fetch_jobs_kind_key", "kind", "key", unique=True),
+        Index("ix_fetch_jobs_next_run_at", "next_run_at"),
+    )
+
+
+class ApiQuotaUsage(Base):
+    __tablename__ = "api_quota_usage"
+
+    provider: Mapped[str] = mapped_column(String(50), nullable=False)
+    day: Mapped[date] = mapped_column(Date, nullable=False)
+    requests: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+
+    __table_args__ = (
+        PrimaryKeyConstraint("provider", "day"),
     )
@@ -1,7 +1,180 @@
-from fastapi import APIRouter
+import csv
+import io
+import json
+from hashlib import md5
+from typing import Any, AsyncIterator, Awaitable, Callable, Literal
+
+from dependency_injector.wiring import Provide, inject
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
+
+from src.analyzer.export import MentionExporter
+from src.analyzer.repository import AnalyzerRepository
+from src.app_container import ApplicationContainer
+from src.core.cache import StatsCache
 
 api_router = APIRouter()
 
 @api_router.get("/health")
 async def health():
     return "ok"
+
+
+async def _cached_response(
+    request: Request,
+    cache: StatsCache,
+    key: tuple,
+    loader: Callable[[], Awaitable[Any]],
+) -> Response:
+    async def load() -> tuple[str, bytes]:
+        body = json.dumps(jsonable_encoder(await loader()), ensure_ascii=False).encode("utf-8")
+        return f'"{md5(body).hexdigest()}"', body
+
+    etag, body = await cache.get_or_load(key, load)
+    headers = {"ETag": etag, "Cache-Control": f"max-age={int(cache.cache.ttl)}"}
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+@api_router.get("/stats")
+@inject
+async def get_stats(
+    request: Request,
+    days: int = Query(7, ge=1, le=365),
+    dedup: bool = False,
+    repository: AnalyzerRepository = Depends(Provide[ApplicationContainer.repository]),
+    cache: StatsCache = Depends(Provide[ApplicationContainer.stats_cache]),
+):
+    return await _cached_response(
+        request,
+        cache,
+        ("stats", days, dedup),
+        lambda: repository.get_mentions_stats(days=days, dedup=dedup),
+    )
+
+
+@api_router.get("/stats/timeseries")
+@inject
+async def get_timeseries(
+    request: Request,
+    days: int = Query(30, ge=1, le=365),
+    granularity: Literal["hour", "day"] = "day",
+    entity: str | None = None,
+    source: str | None = None,
+    repository: AnalyzerRepository = Depends(Provide[ApplicationContainer.repository]),
+    cache: StatsCache = Depends(Provide[ApplicationContainer.stats_cache]),
+):
+    return await _cached_response(
+        request,
+        cache,
+        ("timeseries", days, granularity, entity, source),
+        lambda: repository.get_mentions_timeseries(
+            days=days, granularity=granularity, entity=entity, source=source
+        ),
+    )
+
+
+_STREAM_CHUNK_SIZE = 64 * 1024
+
+
+async def _ndjson_lines(rows: AsyncIterator[dict]) -> AsyncIterator[bytes]:
+    buffer = io.StringIO()
+    async for row in rows:
+        buffer.write(json.dumps(jsonable_encoder(row), ensure_ascii=False) + "\n")
+        if buffer.tell() >= _STREAM_CHUNK_SIZE:
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue().encode("utf-8")
+
+
+async def _csv_lines(rows: AsyncIterator[dict], columns: list[str]) -> AsyncIterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=columns, extrasaction="ignore")
+    writer.writeheader()
+    async for row in rows:
+        writer.writerow({**row, "bucket": row["bucket"].isoformat()})
+        if buffer.tell() >= _STREAM_CHUNK_SIZE:
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue().encode("utf-8")
+
+
+@api_router.get("/stats/timeseries/stream")
+@inject
+async def stream_timeseries(
+    days: int = Query(30, ge=1, le=3650),
+    bucket: Literal["15m", "30m", "1h", "3h", "6h", "12h", "1d", "1w"] = "1h",
+    entity: str | None = None,
+    source: str | None = None,
+    smoothing: Literal["sma", "ema"] | None = None,
+    window: int = Query(3, ge=1, le=1000),
+    format: Literal["ndjson", "csv"] = "ndjson",
+    repository: AnalyzerRepository = Depends(Provide[ApplicationContainer.repository]),
+):
+    rows = repository.iter_timeseries(
+        days=days, bucket=bucket, entity=entity, source=source, smoothing=smoothing, window=window
+    )
+    if format == "csv":
+        columns = ["entity", "source", "bucket", "mentions"] + (["smoothed"] if smoothing else [])
+        return StreamingResponse(_csv_lines(rows, columns), media_type="text/csv")
+    return StreamingResponse(_ndjson_lines(rows), media_type="application/x-ndjson")
+
+
+_EXPORT_MEDIA_TYPES = {
+    "parquet": "application/vnd.apache.parquet",
+    "arrow": "application/vnd.apache.arrow.stream",
+}
+
+
+@api_router.get("/mentions/export")
+@inject
+async def export_mentions(
+    days: int = Query(30, ge=1, le=3650),
+    entity: str | None = None,
+    source: str | None = None,
+    format: Literal["parquet", "arrow"] = "parquet",
+    exporter: MentionExporter = Depends(Provide[ApplicationContainer.exporter]),
+):
+    try:
+        chunks = exporter.iter_file(format=format, days=days, entity=entity, source=source)
+    except RuntimeError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    filename = f"mentions.{format}"
+    return StreamingResponse(
+        chunks,
+        media_type=_EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+@api_router.get("/mentions/latest")
+@inject
+async def get_latest_mentions(
+    request: Request,
+    limit: int = Query(50, ge=1, le=500),
+    snippets: int = Query(1, ge=0, le=20),
+    repository: AnalyzerRepository = Depends(Provide[ApplicationContainer.repository]),
+    cache: StatsCache = Depends(Provide[ApplicationContainer.stats_cache]),
+):
+    return await _cached_response(
+        request,
+        cache,
+        ("latest", limit, snippets),
+        lambda: repository.get_latest_mentions(limit=limit, snippets=snippets),
+    )
+
+
+@api_router.get("/mentions/{mention_id}/snippets")
+@inject
+async def get_mention_snippets(
+    mention_id: int,
+    repository: AnalyzerRepository = Depends(Provide[ApplicationContainer.repository]),
+):
+    mention = await repository.get_mention_snippets(mention_id)
+    if mention is None:
+        raise HTTPException(status_code=404, detail="Mention not found")
+    return mention
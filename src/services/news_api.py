@@ -1,42 +1,176 @@
+import asyncio
+import json
+import logging
+import random
+import time
+
 import aiohttp
 from datetime import datetime, timedelta
+from typing import AsyncIterator
+
+from src.core.http_client import HttpClient
+from src.core.payload_store import PayloadStore
+from src.core.rate_limit import DailyQuota, TokenBucket
+
+logger = logging.getLogger(__name__)
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+MAX_PAGE_SIZE = 100
+
+
+class PartialFetch(Exception):
+    def __init__(self, message: str, articles: list[dict]):
+        super().__init__(message)
+        self.articles = articles
+
 
 class NewsAPIWorker:
-    def __init__(self, api_key: str, base_url: str):
+    def __init__(
+        self,
+        http_client: HttpClient,
+        api_key: str,
+        base_url: str,
+        request_timeout: float = 15,
+        page_size: int = MAX_PAGE_SIZE,
+        max_pages: int = 5,
+        quota_requests: int = 100,
+        quota_period: float = 86400,
+        quota_burst: int = 10,
+        quota_max_wait: float = 60,
+        max_retries: int = 3,
+        retry_backoff: float = 1,
+        combine_queries: bool = True,
+        query_max_length: int = 500,
+        payload_store: PayloadStore | None = None,
+        daily_quota: DailyQuota | None = None,
+    ):
+        self.http_client = http_client
         self.api_key = api_key
         self.base_url = base_url
+        self.timeout = aiohttp.ClientTimeout(total=request_timeout)
+        self.page_size = min(page_size, MAX_PAGE_SIZE)
+        self.max_pages = max_pages
+        self.rate_limit = TokenBucket(
+            rate=quota_requests / quota_period, capacity=quota_burst, max_wait=quota_max_wait
+        )
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self.combine_queries = combine_queries
+        self.query_max_length = query_max_length
+        self.payload_store = payload_store
+        self.daily_quota = daily_quota
+
+    @property
+    def replaying(self) -> bool:
+        return self.payload_store is not None and self.payload_store.replaying
 
+    def build_queries(self, terms: list[str]) -> list[str]:
+        if not self.combine_queries:
+            return list(terms)
 
-    async def fetch_news(self, query: str, days: int = 1) -> list[dict]:
+        queries: list[str] = []
+        current = ""
+        for term in terms:
+            quoted = f'"{term}"' if " " in term else term
+            candidate = f"{current} OR {quoted}" if current else quoted
+            if current and len(candidate) > self.query_max_length:
+                queries.append(current)
+                candidate = quoted
+            current = candidate
+        if current:
+            queries.append(current)
+        return queries
+
+    async def fetch_news(self, query: str, days: int = 1, since: datetime | None = None) -> list[dict]:
         from_date = (datetime.now() - timedelta(days=days)).strftime("%Y-%m-%d")
+        if since is not None and since.strftime("%Y-%m-%d") > from_date:
+            # Naive UTC, the same as the parsed publishedAt values.
+            from_date = since.strftime("%Y-%m-%dT%H:%M:%S")
 
-        async with aiohttp.ClientSession() as session:
+        articles: list[dict] = []
+        for page in range(1, self.max_pages + 1):
             params = {
                 "q": query,
                 "from": from_date,
                 "sortBy": "publishedAt",
                 "apiKey": self.api_key,
                 "language": "ru",
+                "pageSize": self.page_size,
+                "page": page,
             }
+            try:
+                data = await self._request(params)
+            except Exception as e:
+                if not articles:
+                    raise
+                # The pages already read are still returned, but the caller must not treat them as complete.
+                raise PartialFetch(f"Stopped paging {query!r} at page {page}: {str(e)}", articles) from e
+            if data is None:
+                break
+
+            page_articles = [self._parse_article(article) for article in data.get("articles", [])]
+            articles.extend(page_articles)
+            total = data.get("totalResults")
+            if len(page_articles) < self.page_size or (total is not None and len(articles) >= total):
+                break
+
+        return articles
+
+    async def _request(self, params: dict) -> dict | None:
+        attempt = 0
+        while True:
+            await self.rate_limit.acquire()
+            if self.daily_quota is not None:
+                await self.daily_quota.acquire()
+            retry_after = None
+            try:
+                async with self.http_client.session.get(
+                    self.base_url, params=params, timeout=self.timeout
+                ) as response:
+                    if response.status == 426:
+                        # maximumResultsReached: the plan does not allow paging any deeper
+                        return None
+                    if response.status not in RETRY_STATUSES or attempt >= self.max_retries:
+                        response.raise_for_status()
+                        body = await response.read()
+                        if self.payload_store is not None:
+                            await self.payload_store.append("newsapi", params["q"], body)
+                        return json.loads(body)
+                    header = response.headers.get("Retry-After", "")
+                    retry_after = float(header) if header.isdigit() else None
+                    logger.debug(f"NewsAPI responded {response.status}, retrying")
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+                if attempt >= self.max_retries:
+                    raise
+                logger.debug(f"NewsAPI request failed, retrying: {str(e)}")
+            await self._backoff(attempt, retry_after)
+            attempt += 1
+
+    async def _backoff(self, attempt: int, retry_after: float | None = None) -> None:
+        delay = random.uniform(0, self.retry_backoff * 2 ** attempt)
+        if retry_after is not None:
+            delay = max(delay, retry_after)
+        await asyncio.sleep(delay)
+
+    async def iter_replay(self, days: int | None = None) -> AsyncIterator[list[dict]]:
+        # Replays what was fetched within the run's window, the same span a live run would request.
+        if self.payload_store is None:
+            return
+        since = time.time() - days * 86400 if days is not None else None
+        for _, payload in self.payload_store.iter_payloads(["newsapi"], since):
+            yield self.parse_payload(payload)
+            await asyncio.sleep(0)
+
+    @classmethod
+    def parse_payload(cls, payload: bytes) -> list[dict]:
+        return [cls._parse_article(article) for article in json.loads(payload).get("articles", [])]
 
-            async with session.get(self.base_url, params=params) as response:
-                response.raise_for_status()
-                data = await response.json()
-
-                articles = []
-                for article in data.get("articles", []):
-                    articles.append(
-                        {
-                            "title": article["title"],
-                            "link": article["url"],
-                            "published_at": datetime.strptime(
-                                article["publishedAt"], "%Y-%m-%dT%H:%M:%SZ"
-                            ),
-                            "source": article["source"]["name"],
-                            "content": article.get("description", "")
-                            + " "
-                            + article.get("content", ""),
-                        }
-                    )
-
-                return articles
+    @staticmethod
+    def _parse_article(article: dict) -> dict:
+        return {
+            "title": article["title"],
+            "link": article["url"],
+            "published_at": datetime.strptime(article["publishedAt"], "%Y-%m-%dT%H:%M:%SZ"),
+            "source": article["source"]["name"],
+            "content": (article.get("description") or "") + " " + (article.get("content") or ""),
+        }
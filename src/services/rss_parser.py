@@ -1,22 +1,177 @@
-import feedparser  # type: ignore
-
+import asyncio
+import json
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from typing import AsyncGenerator, AsyncIterator
+
+import aiohttp
+
+from src.core.http_client import HttpClient
+from src.core.metrics import fetch_errors, fetch_timings
+from src.core.payload_store import PayloadStore
+from src.core.resource import AppResource
+
+logger = logging.getLogger(__name__)
+
+
+def _parse_feed(content: bytes, url: str) -> list[dict]:
+    import feedparser  # type: ignore
 
-class RSSParser:
-    def __init__(self, feed_urls: list[str]):
+    feed = feedparser.parse(content)
+    articles = []
+    for entry in feed.entries:
+        articles.append({
+            "title": entry.title,
+            "link": entry.link,
+            "published_at": datetime(*entry.published_parsed[:6]),
+            "source": url,
+            "content": entry.get("summary", ""),
+        })
+    return articles
+
+
+class RSSParser(AppResource):
+    def __init__(
+        self,
+        http_client: HttpClient,
+        feed_urls: list[str],
+        state_path: str | None = None,
+        parse_workers: int = 4,
+        request_timeout: float = 15,
+        payload_store: PayloadStore | None = None,
+    ):
+        self.http_client = http_client
         self.feed_urls = feed_urls
+        self.state_path = state_path
+        self.parse_workers = parse_workers
+        self.timeout = aiohttp.ClientTimeout(total=request_timeout)
+        self.feed_state: dict[str, dict[str, str]] = {}
+        self.pending_state: dict[str, dict[str, str]] = {}
+        self.feed_errors: dict[str, str] = {}
+        self.executor: ThreadPoolExecutor | None = None
+        self.payload_store = payload_store
+
+    async def connect(self) -> None:
+        self.executor = ThreadPoolExecutor(
+            max_workers=self.parse_workers, thread_name_prefix="rss-parser"
+        )
+        self.feed_state = await asyncio.to_thread(self._load_state)
 
+    async def disconnect(self) -> None:
+        if self.executor:
+            self.executor.shutdown(wait=False, cancel_futures=True)
 
     async def fetch_news(self) -> list[dict]:
-        articles = []
-        for url in self.feed_urls:
-            feed = feedparser.parse(url)
-            for entry in feed.entries:
-                articles.append({
-                    "title": entry.title,
-                    "link": entry.link,
-                    "published_at": datetime(*entry.published_parsed[:6]),
-                    "source": url,
-                    "content": entry.get("summary", ""),
-                })
-        return articles
+        return [article async for articles in self.iter_news() for article in articles]
+
+    async def iter_news(
+        self, urls: list[str] | None = None, days: int | None = None
+    ) -> AsyncGenerator[list[dict], None]:
+        if self.payload_store is not None and self.payload_store.replaying:
+            async for articles in self._iter_replay(days):
+                yield articles
+            return
+
+        urls = self.feed_urls if urls is None else urls
+        # Validators of a run that never got committed are dropped, so those feeds are downloaded again.
+        self.pending_state = {}
+        tasks = [asyncio.create_task(self._fetch_feed(url)) for url in urls]
+        try:
+            for future in asyncio.as_completed(tasks):
+                yield await future
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def commit_state(self) -> None:
+        # Called once the fetched articles are stored: a 304 from then on must not hide unsaved entries.
+        if not self.pending_state:
+            return
+        self.feed_state.update(self.pending_state)
+        self.pending_state = {}
+        await asyncio.to_thread(self._save_state)
+
+    async def _iter_replay(self, days: int | None = None) -> AsyncIterator[list[dict]]:
+        if self.payload_store is None:
+            return
+        loop = asyncio.get_running_loop()
+        since = time.time() - days * 86400 if days is not None else None
+        pending: list[asyncio.Future] = []
+        for record, payload in self.payload_store.iter_payloads(["rss"], since):
+            pending.append(loop.run_in_executor(self.executor, _parse_feed, payload, record.key))
+            if len(pending) >= self.parse_workers:
+                yield await pending.pop(0)
+        for future in pending:
+            yield await future
+
+    @staticmethod
+    def parse_payload(payload: bytes, url: str) -> list[dict]:
+        return _parse_feed(payload, url)
+
+    async def _fetch_feed(self, url: str) -> list[dict]:
+        self.feed_errors.pop(url, None)
+        try:
+            with fetch_timings.labels(fetcher="rss", source=url).time():
+                downloaded = await self._download(url)
+                if downloaded is None:
+                    logger.debug(f"RSS feed not modified: {url}")
+                    return []
+
+                content, validators = downloaded
+                loop = asyncio.get_running_loop()
+                articles = await loop.run_in_executor(self.executor, _parse_feed, content, url)
+            self.pending_state[url] = validators
+            return articles
+        except Exception as e:
+            fetch_errors.labels(fetcher="rss", source=url).inc()
+            logger.warning(f"Failed to fetch RSS feed {url}: {str(e)}")
+            self.feed_errors[url] = str(e)
+            return []
+
+    async def _download(self, url: str) -> tuple[bytes, dict[str, str]] | None:
+        headers = {}
+        state = self.feed_state.get(url, {})
+        if state.get("etag"):
+            headers["If-None-Match"] = state["etag"]
+        if state.get("last_modified"):
+            headers["If-Modified-Since"] = state["last_modified"]
+
+        async with self.http_client.session.get(
+            url, headers=headers, timeout=self.timeout
+        ) as response:
+            if response.status == 304:
+                return None
+            response.raise_for_status()
+            content = await response.read()
+            if self.payload_store is not None:
+                await self.payload_store.append("rss", url, content)
+
+            validators = {
+                "etag": response.headers.get("ETag", ""),
+                "last_modified": response.headers.get("Last-Modified", ""),
+            }
+            return content, validators
+
+    def _load_state(self) -> dict[str, dict[str, str]]:
+        if not self.state_path or not os.path.exists(self.state_path):
+            return {}
+        try:
+            with open(self.state_path) as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Failed to load RSS feed state: {str(e)}")
+            return {}
+
+    def _save_state(self) -> None:
+        if not self.state_path:
+            return
+        try:
+            tmp_path = f"{self.state_path}.tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(self.feed_state, f)
+            os.replace(tmp_path, self.state_path)
+        except OSError as e:
+            logger.warning(f"Failed to save RSS feed state: {str(e)}")
@@ -1,6 +1,7 @@
 import os
+from typing import Literal
 
-from pydantic import ValidationError
+from pydantic import BaseModel, ValidationError
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -15,19 +16,62 @@ class PostgresSettings(BaseSettings):
     db: str
     user: str
     password: str
+    pool_size: int = 10
+    read_host: str | None = None
+    read_port: int | None = None
+    read_pool_size: int = 10
+    articles_retention_months: int = 12
 
     @property
     def uri(self) -> str:
         return f"postgresql+asyncpg://{self.user}:{self.password}@" f"{self.host}:{self.port}/{self.db}"
 
+    @property
+    def read_uri(self) -> str | None:
+        if not self.read_host:
+            return None
+        return (
+            f"postgresql+asyncpg://{self.user}:{self.password}@"
+            f"{self.read_host}:{self.read_port or self.port}/{self.db}"
+        )
+
+
+class HttpSettings(BaseSettings):
+    pool_size: int = 100
+    pool_size_per_host: int = 10
+    keepalive_timeout: float = 30
+    request_timeout: float = 30
+
 
 class NewsSettings(BaseSettings):
     api_key: str
     base_url: str = "https://newsapi.org/v2/everything"
+    concurrency: int = 5
+    request_timeout: float = 15
+    page_size: int = 100
+    max_pages: int = 5
+    quota_requests: int = 100
+    quota_period: float = 86400
+    quota_burst: int = 10
+    quota_max_wait: float = 60
+    quota_daily_requests: int = 100
+    max_retries: int = 3
+    retry_backoff: float = 1
+    combine_queries: bool = True
+    query_max_length: int = 500
 
 
 class RssParserSettings(BaseSettings):
     rss_urls: list[str] = ["https://lenta.ru/rss/news", "https://habr.com/ru/rss/all/all/"]
+    state_path: str | None = "/userfiles/rss_state.json"
+    parse_workers: int = 4
+    request_timeout: float = 15
+
+
+class EntityDefinition(BaseModel):
+    name: str
+    type: str | None = None
+    aliases: list[str] = []
 
 
 class AnalyzerSettings(BaseSettings):
@@ -38,6 +82,61 @@ class AnalyzerSettings(BaseSettings):
         "Трамп",
         "Trump",
     ]
+    entity_dictionary: list[EntityDefinition] = [
+        EntityDefinition(name="Путин", type="person", aliases=["Putin", "Владимир Путин"]),
+        EntityDefinition(name="Единая Россия", type="party"),
+        EntityDefinition(name="Трамп", type="person", aliases=["Trump", "Дональд Трамп"]),
+    ]
+    inflect_entities: bool = True
+    dictionary_cache_dir: str | None = "/userfiles/cache"
+    bulk_save: bool = True
+    incremental: bool = True
+    fetch_overlap_hours: int = 6
+    queue_size: int = 1000
+    workers: int = 0
+    worker_batch_size: int = 200
+    near_dup_enabled: bool = True
+    near_dup_max_distance: int = 5
+    near_dup_capacity: int = 100_000
+    near_dup_window_hours: int = 48
+    drop_near_duplicates: bool = False
+    save_chunk_size: int = 1000
+    article_cache_size: int = 10_000
+
+
+class SchedulerSettings(BaseSettings):
+    intervals: dict[str, float] = {"newsapi": 3600, "rss": 900}
+    days: int = 1
+    shutdown_timeout: float = 60
+    worker_id: str | None = None
+    lease_timeout: float = 600
+    retry_delay: float = 300
+    claim_size: int = 10
+    poll_interval: float = 30
+
+
+class PayloadStoreSettings(BaseSettings):
+    mode: Literal["live", "record", "replay"] = "live"
+    path: str | None = "/userfiles/payloads"
+    segment_size: int = 64 * 1024 * 1024
+    compression_level: int = 6
+
+
+class ExportSettings(BaseSettings):
+    path: str = "/userfiles/export"
+    batch_size: int = 10_000
+    compression: str = "zstd"
+
+
+class MetricsSettings(BaseSettings):
+    pushgateway_url: str | None = None
+    textfile_path: str | None = None
+
+
+class StatsCacheSettings(BaseSettings):
+    maxsize: int = 256
+    ttl: float = 30
+
 
 class AppSettings(BaseSettings):
     model_config = SettingsConfigDict(env_nested_delimiter="__", extra="ignore")
@@ -48,9 +147,15 @@ class AppSettings(BaseSettings):
 
     server: ServerSettings
     postgres: PostgresSettings
+    http: HttpSettings = HttpSettings()
     news: NewsSettings
     rss_parser: RssParserSettings = RssParserSettings()
     analyzer: AnalyzerSettings = AnalyzerSettings()
+    scheduler: SchedulerSettings = SchedulerSettings()
+    stats_cache: StatsCacheSettings = StatsCacheSettings()
+    metrics: MetricsSettings = MetricsSettings()
+    payload_store: PayloadStoreSettings = PayloadStoreSettings()
+    export: ExportSettings = ExportSettings()
 
 try:
     settings = AppSettings(_env_file=os.getenv("ENV_FILE"))